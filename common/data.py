@@ -42,20 +42,12 @@ class TimeBucket(StrictBaseModel):
         Args:
             datetime (datetime.datetime): A datetime object, assumed to be in UTC.
         """
-        datetime.astimezone(dt.timezone.utc)
-        return TimeBucket(
-            id=utils.seconds_to_hours(
-                datetime.astimezone(tz=dt.timezone.utc).timestamp()
-            )
-        )
+        return TimeBucket(id=utils.time_bucket_id_from_datetime(datetime))
 
     @classmethod
     def to_date_range(cls, bucket: "TimeBucket") -> DateRange:
         """Returns the date range for this time bucket."""
-        return DateRange(
-            start=utils.datetime_from_hours_since_epoch(bucket.id),
-            end=utils.datetime_from_hours_since_epoch(bucket.id + 1),
-        )
+        return utils.time_bucket_id_to_date_range(bucket.id)
 
 
 class DataSource(IntEnum):
@@ -171,9 +163,12 @@ class DataEntityBucket(StrictBaseModel):
     size_bytes: int = Field(ge=0, le=constants.DATA_ENTITY_BUCKET_SIZE_LIMIT_BYTES)
 
 
-@dataclasses.dataclass()
+@dataclasses.dataclass(slots=True)
 class CompressedEntityBucket:
-    """A compressed version of the DataEntityBucket to reduce bytes sent on the wire."""
+    """A compressed version of the DataEntityBucket to reduce bytes sent on the wire.
+
+    Buckets sharing a label are stored column-wise: the i-th time bucket id pairs with the i-th size.
+    """
 
     label: Optional[str] = None
     time_bucket_ids: List[int] = dataclasses.field(default_factory=list)
@@ -17,6 +17,8 @@ As a rule of thumb:
 """
 
 import datetime as dt
+import functools
+import numpy as np
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional
 
@@ -123,4 +125,21 @@ class ScorableMinerIndex(BaseModel):
         description="DataEntityBuckets the miner is serving, scored on uniqueness.",
         max_length=constants.DATA_ENTITY_BUCKET_COUNT_LIMIT_PER_MINER_INDEX_PROTOCOL_4,
     )
-    last_updated: dt.datetime = Field(description="Time last updated in UTC.")
\ No newline at end of file
+    last_updated: dt.datetime = Field(description="Time last updated in UTC.")
+
+    @functools.cached_property
+    def cumulative_scorable_bytes(self) -> np.ndarray:
+        """Running total of scorable_bytes over scorable_data_entity_buckets.
+
+        Computed once per index and used for weighted sampling of buckets.
+        """
+        return np.cumsum(
+            np.fromiter(
+                (
+                    bucket.scorable_bytes
+                    for bucket in self.scorable_data_entity_buckets
+                ),
+                dtype=np.int64,
+                count=len(self.scorable_data_entity_buckets),
+            )
+        )
@@ -2,7 +2,7 @@ import dataclasses
 import datetime as dt
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class DateRange:
     """Represents a specific time range from start time inclusive to end time exclusive."""
 
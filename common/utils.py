@@ -3,18 +3,34 @@
 import datetime as dt
 import functools
 import concurrent
+import logging
+import msgpack
+import numpy as np
 import pickle
+import pickletools
 import sys
+import threading
 import time
-from math import floor
+from collections import OrderedDict
 from typing import Any, Callable, List, Optional, Dict
 import bittensor as bt
-from functools import lru_cache, update_wrapper
+from functools import update_wrapper
 from common.date_range import DateRange
 
-_KB = 1024
-_MB = 1024 * _KB
-_GB = 1024 * _MB
+_KB = 1 << 10
+_MB = 1 << 20
+_GB = 1 << 30
+_SECONDS_PER_HOUR = 3600
+
+
+def is_debug_logging_enabled() -> bool:
+    """Returns whether bittensor debug logs are emitted, so hot paths can skip formatting them."""
+    return bt.logging.get_level() <= logging.DEBUG
+
+
+def is_trace_logging_enabled() -> bool:
+    """Returns whether bittensor trace logs are emitted. Bittensor's trace level sits below DEBUG."""
+    return bt.logging.get_level() < logging.DEBUG
 
 
 def mb_to_bytes(mb: int) -> int:
@@ -29,12 +45,16 @@ def gb_to_bytes(gb: int) -> int:
 
 def seconds_to_hours(seconds: int) -> int:
     """Returns the total number of hours, rounded down."""
-    return seconds // 3600
+    return seconds // _SECONDS_PER_HOUR
+
+
+_EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+_ONE_HOUR = dt.timedelta(hours=1)
 
 
 def datetime_from_hours_since_epoch(hours: int) -> dt.datetime:
     """Returns a datetime object from the provided hours since epoch."""
-    return dt.datetime.fromtimestamp(hours * 3600, tz=dt.timezone.utc)
+    return _EPOCH + dt.timedelta(hours=int(hours))
 
 
 def is_miner(uid: int, metagraph: bt.metagraph, vpermit_rao_limit: int) -> bool:
@@ -56,6 +76,16 @@ def is_validator(uid: int, metagraph: bt.metagraph, vpermit_rao_limit: int = 10_
     return metagraph.validator_permit[uid] and float(metagraph.S[uid]) >= vpermit_rao_limit
 
 
+def get_validator_mask(metagraph: bt.metagraph, vpermit_rao_limit: int = 10_000) -> np.ndarray:
+    """Returns a boolean array indexed by UID that is True where 'is_validator' would be True.
+
+    Intended to be computed once per metagraph sync so hot paths can do a single array lookup.
+    """
+    return np.asarray(metagraph.validator_permit, dtype=bool) & (
+        np.asarray(metagraph.S, dtype=np.float64) >= vpermit_rao_limit
+    )
+
+
 def get_validator_data(metagraph: bt.metagraph, vpermit_rao_limit: int) -> Dict[str, Dict[str, Any]]:
     """Retrieve validator data (hotkey, percent stake) from metagraph. For use in Gravity."""
     total_stake = sum(
@@ -79,20 +109,18 @@ def get_validator_data(metagraph: bt.metagraph, vpermit_rao_limit: int) -> Dict[
 
 def get_miner_uids(metagraph: bt.metagraph, vpermit_rao_limit: int) -> List[int]:
     """Gets the uids of all miners in the metagraph."""
-    return sorted(
-        [
-            uid.item()
-            for uid in metagraph.uids
-            if is_miner(uid.item(), metagraph, vpermit_rao_limit)
-        ]
-    )
+    # Everyone who isn't a validator is a miner (see is_miner).
+    miner_mask = ~get_validator_mask(metagraph, vpermit_rao_limit)
+    return np.sort(np.asarray(metagraph.uids)[miner_mask]).tolist()
 
 
 def get_uid(wallet: bt.wallet, metagraph: bt.metagraph) -> Optional[int]:
     """Gets the uid of the wallet in the metagraph or None if not registered."""
-    if wallet.hotkey.ss58_address in metagraph.hotkeys:
+    # A single scan of the hotkeys, rather than a membership check followed by index().
+    try:
         return metagraph.hotkeys.index(wallet.hotkey.ss58_address)
-    return None
+    except ValueError:
+        return None
 
 
 def assert_registered(wallet: bt.wallet, metagraph: bt.metagraph):
@@ -106,22 +134,28 @@ def assert_registered(wallet: bt.wallet, metagraph: bt.metagraph):
         sys.exit(1)
 
 
+def time_bucket_id_from_epoch_seconds(seconds: float) -> int:
+    """Returns the Timebucket ID from the provided seconds since epoch."""
+    return int(seconds // _SECONDS_PER_HOUR)
+
+
 def time_bucket_id_from_datetime(datetime: dt.datetime) -> int:
     """Returns the Timebucket ID from the provided datetime.
 
     Args:
         datetime (datetime.datetime): A datetime object, assumed to be in UTC.
     """
-    return seconds_to_hours(datetime.astimezone(tz=dt.timezone.utc).timestamp())
+    # timestamp() already accounts for the tzinfo of aware datetimes, so no astimezone() copy is needed.
+    return time_bucket_id_from_epoch_seconds(datetime.timestamp())
 
 
-@classmethod
+# DateRanges are immutable and the same recent time buckets are converted for every miner evaluated,
+# so the conversions are cached.
+@functools.lru_cache(maxsize=4096)
 def time_bucket_id_to_date_range(bucket: int) -> DateRange:
     """Returns the date range from a Timebucket ID."""
-    return DateRange(
-        start=datetime_from_hours_since_epoch(bucket),
-        end=datetime_from_hours_since_epoch(bucket + 1),
-    )
+    start = datetime_from_hours_since_epoch(bucket)
+    return DateRange(start=start, end=start + _ONE_HOUR)
 
 def parse_iso_date(date_str: str) -> Optional[dt.datetime]:
     """
@@ -147,21 +181,81 @@ def parse_iso_date(date_str: str) -> Optional[dt.datetime]:
         return None
 
 
+# Large write buffer so big pickles are flushed in a few syscalls.
+_PICKLE_BUFFER_SIZE = 1 << 20
+# Pickles at least this large are run through pickletools.optimize, which is linear in the opcode count.
+_PICKLE_OPTIMIZE_THRESHOLD = 64 * 1024
+
+
+def _pickle_to_bytes(obj: Any) -> bytes:
+    """Pickles 'obj', stripping unused memo opcodes from large results."""
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) > _PICKLE_OPTIMIZE_THRESHOLD:
+        data = pickletools.optimize(data)
+    return data
+
+
 def serialize_to_file(obj: Any, filename: str) -> None:
     """
     Serializes 'obj' and writes it to 'filename'
     """
-    with open(filename, "wb") as file:
-        pickle.dump(obj, file)
+    data = _pickle_to_bytes(obj)
+    with open(filename, "wb", buffering=_PICKLE_BUFFER_SIZE) as file:
+        file.write(data)
 
 
 def deserialize_from_file(filename: str) -> Any:
     """
     Deserialize an object from a file.
     """
+    # Read the whole file once and unpickle from memory rather than streaming opcodes off disk.
+    with open(filename, "rb") as file:
+        data = file.read()
+    return pickle.loads(data)
+
+
+# One byte tags prefixed to state files written by dump_state to record the codec used.
+_STATE_TAG_MSGPACK = b"M"
+_STATE_TAG_PICKLE = b"P"
+
+
+def dump_state(obj: Any, filename: str, unsafe_pickle: bool = False) -> None:
+    """
+    Writes plain internal state (dicts, lists, str, int, float, bool, bytes, None) to 'filename' using msgpack.
+
+    Tuples are stored as lists. Objects msgpack cannot encode are only written (via pickle) when
+    'unsafe_pickle' is True, since loading a pickle can execute arbitrary code.
+    """
+    try:
+        data = _STATE_TAG_MSGPACK + msgpack.packb(obj, use_bin_type=True)
+    except (TypeError, ValueError, OverflowError):
+        if not unsafe_pickle:
+            raise
+        data = _STATE_TAG_PICKLE + _pickle_to_bytes(obj)
+
+    with open(filename, "wb", buffering=_PICKLE_BUFFER_SIZE) as file:
+        file.write(data)
+
+
+def load_state(filename: str, unsafe_pickle: bool = False) -> Any:
+    """
+    Reads state previously written by dump_state from 'filename'.
+
+    Raises a ValueError if the file holds pickled state and 'unsafe_pickle' is not set.
+    """
     with open(filename, "rb") as file:
-        obj = pickle.load(file)
-    return obj
+        data = file.read()
+
+    tag, payload = data[:1], memoryview(data)[1:]
+    if tag == _STATE_TAG_MSGPACK:
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    if tag == _STATE_TAG_PICKLE:
+        if not unsafe_pickle:
+            raise ValueError(
+                f"Refusing to unpickle {filename} without unsafe_pickle=True."
+            )
+        return pickle.loads(payload)
+    raise ValueError(f"Unrecognized state file format in {filename}.")
 
 
 # LRU Cache with TTL
@@ -194,41 +288,45 @@ def ttl_cache(maxsize: int = 128, typed: bool = False, ttl: int = -1):
     """
     if ttl <= 0:
         ttl = 65536
-    hash_gen = _ttl_hash_gen(ttl)
 
     def wrapper(func: Callable) -> Callable:
-        @lru_cache(maxsize, typed)
-        def ttl_func(ttl_hash, *args, **kwargs):
-            return func(*args, **kwargs)
+        # Maps call key -> (expiry, value), ordered from least to most recently used.
+        cache: OrderedDict = OrderedDict()
+        cache_get = cache.get
+        move_to_end = cache.move_to_end
+        make_key = functools._make_key
+        lock = threading.Lock()
 
         def wrapped(*args, **kwargs) -> Any:
-            th = next(hash_gen)
-            return ttl_func(th, *args, **kwargs)
-
+            key = make_key(args, kwargs, typed) if kwargs or typed else args
+            now = time.monotonic()
+            entry = cache_get(key)
+            if entry is not None and entry[0] > now:
+                try:
+                    move_to_end(key)
+                except KeyError:
+                    # Evicted by another thread between the lookup and the reorder.
+                    pass
+                return entry[1]
+
+            result = func(*args, **kwargs)
+            with lock:
+                cache[key] = (now + ttl, result)
+                move_to_end(key)
+                if maxsize is not None and len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+
+        wrapped.cache_clear = cache_clear
         return update_wrapper(wrapped, func)
 
     return wrapper
 
 
-def _ttl_hash_gen(seconds: int):
-    """
-    Internal generator function used by the `ttl_cache` decorator to generate a new hash value at regular
-    time intervals specified by `seconds`.
-
-    Args:
-        seconds (int): The number of seconds after which a new hash value will be generated.
-
-    Yields:
-        int: A hash value that represents the current time interval.
-
-    This generator is used to create time-based hash values that enable the `ttl_cache` to determine
-    whether cached entries are still valid or if they have expired and should be recalculated.
-    """
-    start_time = time.time()
-    while True:
-        yield floor((time.time() - start_time) / seconds)
-
-
 # 12 seconds updating block.
 @ttl_cache(maxsize=1, ttl=12)
 def ttl_get_block(self) -> int:
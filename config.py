@@ -1,23 +1,38 @@
 # config.py
 
-# Apify Configuration
-CONTROLLER_ACTOR_ID = "sn01978ms/sn13-controller-actor"
+from dataclasses import dataclass
 
-# Scraper Actor IDs
-X_SCRAPER_ACTOR_ID = "xtdata/twitter-x-scraper"
-REDDIT_SCRAPER_ACTOR_ID = "curious_coder/reddit-scraper"
-YOUTUBE_SCRAPER_ACTOR_ID = "streamers/youtube-scraper"
 
-# Backup Scraper Actor IDs
-# X_SCRAPER_ACTOR_ID = "apidojo/tweet-scraper"
-# REDDIT_SCRAPER_ACTOR_ID = "harshmaur/reddit-scraper-pro"
-# YOUTUBE_SCRAPER_ACTOR_ID = "apidojo/youtube-scraper"
+@dataclass(frozen=True, slots=True)
+class _Config:
+    """Immutable project settings. Prefer `from config import CONFIG` over the module-level aliases."""
 
-# Future Bittensor Configuration
-MINER_WALLET_NAME = "my_miner_wallet" # Example name
-MINER_HOTKEY_NAME = "default"         # Example name
-SUBNET_13_NETUID_TESTNET = 13         # From research [1]
+    # Apify Configuration
+    CONTROLLER_ACTOR_ID: str = "sn01978ms/sn13-controller-actor"
 
+    # Scraper Actor IDs
+    X_SCRAPER_ACTOR_ID: str = "xtdata/twitter-x-scraper"
+    REDDIT_SCRAPER_ACTOR_ID: str = "curious_coder/reddit-scraper"
+    YOUTUBE_SCRAPER_ACTOR_ID: str = "streamers/youtube-scraper"
 
+    # Backup Scraper Actor IDs
+    # X_SCRAPER_ACTOR_ID: str = "apidojo/tweet-scraper"
+    # REDDIT_SCRAPER_ACTOR_ID: str = "harshmaur/reddit-scraper-pro"
+    # YOUTUBE_SCRAPER_ACTOR_ID: str = "apidojo/youtube-scraper"
 
+    # Future Bittensor Configuration
+    MINER_WALLET_NAME: str = "my_miner_wallet" # Example name
+    MINER_HOTKEY_NAME: str = "default"         # Example name
+    SUBNET_13_NETUID_TESTNET: int = 13         # From research [1]
 
+
+CONFIG = _Config()
+
+# Module-level aliases kept for backwards compatibility.
+CONTROLLER_ACTOR_ID = CONFIG.CONTROLLER_ACTOR_ID
+X_SCRAPER_ACTOR_ID = CONFIG.X_SCRAPER_ACTOR_ID
+REDDIT_SCRAPER_ACTOR_ID = CONFIG.REDDIT_SCRAPER_ACTOR_ID
+YOUTUBE_SCRAPER_ACTOR_ID = CONFIG.YOUTUBE_SCRAPER_ACTOR_ID
+MINER_WALLET_NAME = CONFIG.MINER_WALLET_NAME
+MINER_HOTKEY_NAME = CONFIG.MINER_HOTKEY_NAME
+SUBNET_13_NETUID_TESTNET = CONFIG.SUBNET_13_NETUID_TESTNET
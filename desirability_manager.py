@@ -1,24 +1,84 @@
 # /home/sn0man/projects/data-universe/desirability_manager.py
 
 import httpx
+import importlib.util
 import logging
-import json
+import orjson
+import time
+import types
+from collections.abc import Mapping
+
+# HTTP/2 needs the optional 'h2' package; fall back to HTTP/1.1 keep-alive without it.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='🧠 DESIRABILITY_MANAGER: %(message)s')
 
+# Static fallback targets, built once at import since they never change.
+_X_HANDLES = (
+    '#bittensor', '#tao', '#crypto', '#btc', '#bitcoin',
+    '#cryptocurrency', '#ai', '#decentralized', '#web3',
+    '#machinelearning', '#llm', '#defi', '#blockchain'
+)
+_REDDIT_SUBREDDITS = (
+    'bittensor_',
+    'CryptoCurrency',
+    'datascience',
+    'MachineLearning',
+    'artificial',
+    'singularity',
+    'decentralizedAI',
+)
+_YOUTUBE_KEYWORDS = (
+    'bittensor', 'decentralized ai', 'opentensor', 'artificial intelligence',
+    'machine learning tutorial', 'crypto analysis', 'latest tech news'
+)
+# Read-only, since the same mapping is handed to every caller for the life of the process.
+_STATIC_FALLBACK_TARGETS = types.MappingProxyType({
+    'x_handles': _X_HANDLES,
+    'reddit_subreddits': _REDDIT_SUBREDDITS,
+    'youtube_keywords': _YOUTUBE_KEYWORDS,
+})
+
+# (expiry, targets) of the last successful dynamic fetch, keyed by api_url. Kept at module level so that
+# every manager in a long-lived process shares it. A one-shot run such as trigger_controller starts with it
+# empty, so it only saves requests for processes that poll more than once.
+_DYNAMIC_TARGETS_CACHE = {}
+
 class DesirabilityManager:
     """
     Manages fetching desirable targets for the scrapers, with a fallback mechanism.
     """
-    def __init__(self, api_url="https://sn13-dashboard.api.macrocosmos.ai/api/desirability"):
+    def __init__(self, api_url="https://sn13-dashboard.api.macrocosmos.ai/api/desirability", cache_ttl_seconds=600):
         """
         Initializes the DesirabilityManager.
         Args:
             api_url (str): The URL of the dashboard API to fetch dynamic targets from.
+            cache_ttl_seconds (int): How long fetched dynamic targets are served before querying the API again.
         """
         self.api_url = api_url
-        self.client = httpx.AsyncClient(timeout=10.0)
+        self.cache_ttl_seconds = cache_ttl_seconds
+        # Pool connections so repeated polls reuse the same TCP/TLS session.
+        transport = httpx.AsyncHTTPTransport(
+            retries=2,
+            http2=_HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=2, keepalive_expiry=60.0),
+        )
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            transport=transport,
+            headers={"Accept": "application/json", "Accept-Encoding": "gzip"},
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        """Closes the underlying HTTP client and its pooled connections."""
+        await self.client.aclose()
 
     async def get_dynamic_targets(self) -> dict | None:
         """
@@ -30,11 +90,15 @@ class DesirabilityManager:
         try:
             response = await self.client.get(self.api_url)
             response.raise_for_status()  # Raises an exception for 4xx or 5xx status codes
-            return response.json()
-        except json.JSONDecodeError:
+            content = response.content
+            if not content:
+                logging.warning("The Dashboard API returned an empty response.")
+                return None
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
             logging.warning("Failed to decode JSON from API response. The API might be down or returning non-JSON content.")
-            # Log the first 500 characters of the response to help diagnose the issue.
-            logging.warning(f"Response text (first 500 chars): {response.text[:500]}")
+            # Log the first 500 bytes of the response to help diagnose the issue, without decoding the whole body.
+            logging.warning(f"Response content (first 500 bytes): {content[:500]!r}")
             return None
         except httpx.HTTPStatusError as e:
             logging.warning(f"Failed to fetch data from the Dashboard API. Status code: {e.response.status_code}")
@@ -43,49 +107,40 @@ class DesirabilityManager:
             logging.warning(f"Failed to fetch data from the Dashboard API. Error: {e}")
             return None
 
-    def get_static_fallback_targets(self) -> dict:
+    def get_static_fallback_targets(self) -> Mapping:
         """
         Provides an updated, hardcoded list of high-value targets to be used
         if the dynamic fetch fails. This ensures the miner can always continue to operate.
         This list is based on a strategic analysis of communities relevant to Bittensor.
         """
         logging.info("Using updated, high-value static fallback targets.")
-        return {
-            'x_handles': [
-                '#bittensor', '#tao', '#crypto', '#btc', '#bitcoin',
-                '#cryptocurrency', '#ai', '#decentralized', '#web3',
-                '#machinelearning', '#llm', '#defi', '#blockchain '
-            ],
-            # ======================================================================
-            # CORRECTED LINE:
-            # The original error was on the line below. A key ('reddit_subreddits')
-            # must be followed by a colon and a value. Here, the value is a list
-            # of strings, where each string is the name of a subreddit.
-            # ======================================================================
-            'reddit_subreddits': [
-                'bittensor_',
-                'CryptoCurrency',
-                'datascience',
-                'MachineLearning',
-                'artificial',
-                'singularity',
-                'decentralizedAI',
-            ],
-            'youtube_keywords': [
-                'bittensor', 'decentralized ai', 'opentensor', 'artificial intelligence',
-                'machine learning tutorial', 'crypto analysis', 'latest tech news'
-            ]
-        }
+        return _STATIC_FALLBACK_TARGETS
 
-    async def get_desirable_targets(self) -> dict:
+    def invalidate(self):
+        """Drops any cached dynamic targets so the next call queries the API."""
+        _DYNAMIC_TARGETS_CACHE.pop(self.api_url, None)
+
+    async def get_desirable_targets(self) -> Mapping:
         """
-        The main method to get targets. It first tries to fetch dynamic targets
-        and falls back to a static list if the dynamic fetch fails.
+        The main method to get targets. Dynamic targets are cached for cache_ttl_seconds.
+        Once expired it tries to fetch them again, serving the previous (stale) result if
+        the fetch fails, and falls back to a static list if nothing was ever fetched.
+        Cached targets are returned as a shallow copy, so callers cannot alter the cache.
         """
+        now = time.monotonic()
+        entry = _DYNAMIC_TARGETS_CACHE.get(self.api_url)
+        if entry is not None and entry[0] > now:
+            logging.info("Using cached dynamic targets.")
+            return dict(entry[1])
+
         dynamic_targets = await self.get_dynamic_targets()
         if dynamic_targets:
             logging.info("Successfully fetched dynamic targets from the dashboard.")
-            return dynamic_targets
+            _DYNAMIC_TARGETS_CACHE[self.api_url] = (now + self.cache_ttl_seconds, dynamic_targets)
+            return dict(dynamic_targets)
+        elif entry is not None:
+            logging.warning("Dynamic fetch failed. Serving previously fetched targets.")
+            return dict(entry[1])
         else:
             logging.warning("Falling back to static targets.")
             return self.get_static_fallback_targets()
@@ -1,6 +1,12 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 
+# The background listener that writes queued records to the console, if logging has been set up.
+_listener = None
+
 def setup_logging():
     """
     Configures the root logger for the entire application.
@@ -8,7 +14,12 @@ def setup_logging():
     This function establishes a centralized logging system that outputs
     structured, formatted log messages to the console. It is designed to be
     called only once when the application first starts up.
+
+    Records are handed to a queue and written by a background listener thread,
+    so logging calls from the many worker threads never block on stdout.
     """
+    global _listener
+
     # 1. Define the standardized format for all log messages.
     #    - %(asctime)s: The timestamp when the log was created.
     #    - %(name)s: The name of the logger (usually the module name, e.g., 'target_provider').
@@ -23,12 +34,29 @@ def setup_logging():
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO) # Set the minimum level of messages to process.
 
-    # 3. Add a handler to send logs to the console (standard output).
+    # 3. Add a handler that enqueues records, and a listener that sends them to the console (standard output).
     #    The 'if not root_logger.handlers:' check is a safeguard to prevent
     #    adding duplicate handlers if this function is accidentally called more than once.
     if not root_logger.handlers:
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
-        root_logger.addHandler(console_handler)
+        _listener = logging.handlers.QueueListener(
+            log_queue, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+        # Flush any queued records when the interpreter exits.
+        atexit.register(stop_logging)
 
     logging.info("Logging has been configured successfully.")
+
+
+def stop_logging():
+    """Stops the background listener after writing out any queued log records."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
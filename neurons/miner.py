@@ -16,13 +16,16 @@
 # DEALINGS IN THE SOFTWARE.
 
 from collections import defaultdict
+import asyncio
 import copy
+import signal
 import sys
 import threading
 import time
 import traceback
 import typing
 import bittensor as bt
+import numpy as np
 import datetime as dt
 from common import constants, utils
 from common.data import CompressedMinerIndex, TimeBucket
@@ -61,6 +64,12 @@ class Miner:
     """The Glorious Miner."""
 
     def __init__(self, config=None):
+        # Pre-bind the logging methods used on the request handling hot path.
+        self._log_info = bt.logging.info
+        self._log_trace = bt.logging.trace
+        self._log_error = bt.logging.error
+        self._log_success = bt.logging.success
+
         self.config = copy.deepcopy(config or create_config(NeuronType.MINER))
         check_config(self.config)
 
@@ -88,6 +97,14 @@ class Miner:
             self.metagraph = self.subtensor.metagraph(self.config.netuid)
             bt.logging.info(f"Metagraph: {self.metagraph}.")
 
+            # Map hotkeys to uids once per metagraph sync so request handling avoids linear scans.
+            self._hotkey_to_uid: typing.Dict[str, int] = {
+                hk: i for i, hk in enumerate(self.metagraph.hotkeys)
+            }
+            self._validator_mask = utils.get_validator_mask(
+                self.metagraph, self.config.vpermit_rao_limit
+            )
+
             # Each miner gets a unique identity (UID) in the network for differentiation.
             # TODO: Stop doing meaningful work in the constructor to make neurons more testable.
             if self.wallet.hotkey.ss58_address in self.metagraph.hotkeys:
@@ -138,9 +155,13 @@ class Miner:
             bt.logging.success(f"Axon created: {self.axon}.")
 
         # Instantiate runners.
-        self.should_exit: bool = False
+        # Set to stop the miner's loops. Waiting on it lets loops sleep until the next deadline or exit.
+        self._exit_event = threading.Event()
         self.is_running: bool = False
-        self.thread: threading.Thread = None
+        # The main loop runs as a task on this event loop; _async_exit_event wakes it for shutdown.
+        self._loop: asyncio.AbstractEventLoop = None
+        self._async_exit_event: asyncio.Event = None
+        self._task: asyncio.Task = None
         self.compressed_index_refresh_thread: threading.Thread = None
         self.hugging_face_thread: threading.Thread = None
         self.lock = threading.RLock()
@@ -204,7 +225,7 @@ class Miner:
         """
         Refreshes the cached compressed miner index periodically off the hot path of GetMinerIndex requests.
         """
-        while not self.should_exit:
+        while not self._exit_event.is_set():
             try:
                 # Refresh the index if it hasn't been refreshed in the configured time period.
                 self.storage.refresh_compressed_index(
@@ -230,7 +251,7 @@ class Miner:
             return
 
         last_update = None
-        while not self.should_exit:
+        while not self._exit_event.is_set():
             try:
                 current_datetime = dt.datetime.utcnow()
 
@@ -264,7 +285,7 @@ class Miner:
         time_sleep_val = dt.timedelta(minutes=60).total_seconds()
         time.sleep(time_sleep_val)
 
-        while not self.should_exit:
+        while not self._exit_event.is_set():
             try:
                 unique_id = self.hf_uploader.unique_id  # Assuming this exists in the DualUploader
                 if self.storage.should_upload_hf_data(unique_id):
@@ -284,7 +305,7 @@ class Miner:
         time_sleep_val = dt.timedelta(minutes=30).total_seconds()
         time.sleep(time_sleep_val)
 
-        while not self.should_exit:
+        while not self._exit_event.is_set():
             try:
                 bt.logging.info("Starting S3 partitioned upload for DD data")
                 success = self.s3_partitioned_uploader.upload_dd_data()
@@ -299,23 +320,25 @@ class Miner:
             time_sleep_val = dt.timedelta(hours=2).total_seconds()
             time.sleep(time_sleep_val)
 
-    def run(self):
+    async def run(self):
         """
-        Initiates and manages the main loop for the miner.
+        Initiates and manages the main loop for the miner on the running event loop.
         """
 
         if self.config.offline:
             bt.logging.success("Running in offline mode. Skipping axon serving.")
         else:
             # Check that miner is registered on the network.
-            self.sync()
+            await asyncio.to_thread(self.sync)
 
             # Serve passes the axon information to the network + netuid we are hosting on.
             # This will auto-update if the axon port of external ip have changed.
             bt.logging.info(
                 f"Serving miner axon {self.axon} on network: {self.config.subtensor.chain_endpoint} with netuid: {self.config.netuid}."
             )
-            self.axon.serve(netuid=self.config.netuid, subtensor=self.subtensor)
+            await asyncio.to_thread(
+                self.axon.serve, netuid=self.config.netuid, subtensor=self.subtensor
+            )
 
             # Start  starts the miner's axon, making it active on the network.
             self.axon.start()
@@ -325,55 +348,76 @@ class Miner:
 
         self.scraping_coordinator.run_in_background_thread()
 
-        while not self.should_exit:
-            # This loop maintains the miner's operations until intentionally stopped.
-            try:
-                # In offline mode we just idle while the scraping_coordinator runs.
-                if self.config.offline:
-                    while not self.should_exit:
-                        time.sleep(12)
-                else:
-                    # Epoch length defaults to 100 blocks at 12 seconds each for 20 minutes.
-                    while dt.datetime.now() - self.last_sync_timestamp < (
-                        dt.timedelta(seconds=12 * self.config.neuron.epoch_length)
-                    ):
-                        # Wait before checking again.
-                        time.sleep(12)
+        try:
+            while not self._exit_event.is_set():
+                # This loop maintains the miner's operations until intentionally stopped.
+                try:
+                    # In offline mode we just idle while the scraping_coordinator runs.
+                    if self.config.offline:
+                        await self._async_exit_event.wait()
+                    else:
+                        # Epoch length defaults to 100 blocks at 12 seconds each for 20 minutes.
+                        epoch_duration = dt.timedelta(
+                            seconds=12 * self.config.neuron.epoch_length
+                        )
+                        # Sleep until the end of the epoch in one wait, rechecking in case the clock drifted.
+                        while True:
+                            remaining = (
+                                epoch_duration
+                                - (dt.datetime.now() - self.last_sync_timestamp)
+                            ).total_seconds()
+                            if remaining <= 0 or await self._wait_for_exit(max(1, remaining)):
+                                break
 
                         # Check if we should exit.
-                        if self.should_exit:
+                        if self._exit_event.is_set():
                             break
 
-                    # Sync metagraph.
-                    self.sync()
+                        # Sync metagraph.
+                        await asyncio.to_thread(self.sync)
 
-                    self._log_status(self.step)
+                        self._log_status(self.step)
 
-                    self.last_sync_timestamp = dt.datetime.now()
-                    self.step += 1
+                        self.last_sync_timestamp = dt.datetime.now()
+                        self.step += 1
 
-            # If someone intentionally stops the miner, it'll safely terminate operations.
-            except KeyboardInterrupt:
-                if not self.config.offline:
-                    self.axon.stop()
-                self.scraping_coordinator.stop()
-                bt.logging.success("Miner killed by keyboard interrupt.")
-                sys.exit()
+                # In case of unforeseen errors, the miner will log the error and continue operations.
+                except Exception:
+                    bt.logging.error(traceback.format_exc())
 
-            # In case of unforeseen errors, the miner will log the error and continue operations.
-            except Exception as e:
-                bt.logging.error(traceback.format_exc())
+        # If someone intentionally stops the miner (or the task is cancelled), it'll safely terminate operations.
+        finally:
+            if not self.config.offline:
+                self.axon.stop()
+            self.scraping_coordinator.stop()
+            bt.logging.success("Miner stopped.")
 
-    def run_in_background_thread(self):
+    async def _wait_for_exit(self, timeout: float) -> bool:
+        """Waits up to 'timeout' seconds for the miner to be asked to exit. Returns True if it was."""
+        try:
+            await asyncio.wait_for(self._async_exit_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._exit_event.is_set()
+
+    def request_exit(self):
+        """Asks all of the miner's loops to exit. Safe to call from any thread or from a signal handler."""
+        self._exit_event.set()
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._async_exit_event.set)
+
+    def run_in_background_task(self):
         """
-        Starts the miner's operations in a separate background thread.
-        This is useful for non-blocking operations.
+        Starts the miner's main loop as a task on the running event loop,
+        along with the helper threads for index refreshes and uploads.
         """
         if not self.is_running:
-            bt.logging.debug("Starting miner in background thread.")
-            self.should_exit = False
-            self.thread = threading.Thread(target=self.run, daemon=True)
-            self.thread.start()
+            bt.logging.debug("Starting miner in background task.")
+            self._exit_event.clear()
+            self._loop = asyncio.get_running_loop()
+            self._async_exit_event = asyncio.Event()
+            self._task = self._loop.create_task(self.run())
+
             self.compressed_index_refresh_thread = threading.Thread(
                 target=self.refresh_index, daemon=True
             )
@@ -396,32 +440,42 @@ class Miner:
             self.is_running = True
             bt.logging.debug("Started")
 
-    def stop_run_thread(self):
+    async def wait_for_exit_request(self):
+        """Blocks until the miner is asked to exit, e.g. by a shutdown signal."""
+        await self._async_exit_event.wait()
+
+    async def stop_run_task(self):
         """
-        Stops the miner's operations that are running in the background thread.
+        Stops the miner's main loop task and its helper threads.
         """
         if self.is_running:
-            bt.logging.debug("Stopping miner in background thread.")
-            self.should_exit = True
-            self.thread.join(5)
+            bt.logging.debug("Stopping miner background task.")
+            self.request_exit()
+            try:
+                # Cancels the task if it doesn't finish in time.
+                await asyncio.wait_for(self._task, 5)
+            except asyncio.TimeoutError:
+                bt.logging.warning("Miner main loop did not stop in time and was cancelled.")
+            except Exception:
+                bt.logging.error(traceback.format_exc())
             self.compressed_index_refresh_thread.join(5)
             self.s3_partitioned_thread.join(5)
             self.lookup_thread.join(5)
             self.is_running = False
             bt.logging.debug("Stopped")
 
-    def __enter__(self):
+    async def __aenter__(self):
         """
-        Starts the miner's operations in a background thread upon entering the context.
-        This method facilitates the use of the miner in a 'with' statement.
+        Starts the miner's operations in a background task upon entering the context.
+        This method facilitates the use of the miner in an 'async with' statement.
         """
-        self.run_in_background_thread()
+        self.run_in_background_task()
         return self
 
-    def __exit__(self, exc_type, exc_value, traceback):
+    async def __aexit__(self, exc_type, exc_value, traceback):
         """
         Stops the miner's background operations upon exiting the context.
-        This method facilitates the use of the miner in a 'with' statement.
+        This method facilitates the use of the miner in an 'async with' statement.
 
         Args:
             exc_type: The type of the exception that caused the context to be exited.
@@ -431,7 +485,7 @@ class Miner:
             traceback: A traceback object encoding the stack trace.
                        None if the context was exited without an exception.
         """
-        self.stop_run_thread()
+        await self.stop_run_task()
 
     def resync_metagraph(self):
         """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
@@ -439,21 +493,25 @@ class Miner:
 
         # Sync the metagraph.
         new_metagraph = self.subtensor.metagraph(netuid=self.config.netuid)
+        hotkey_to_uid = {hk: i for i, hk in enumerate(new_metagraph.hotkeys)}
+        validator_mask = utils.get_validator_mask(new_metagraph, self.vpermit_rao_limit)
         with self.lock:
             self.metagraph = new_metagraph
+            self._hotkey_to_uid = hotkey_to_uid
+            self._validator_mask = validator_mask
 
         bt.logging.success("Successfuly resynced the metagraph.")
 
     def _log_status(self, step: int):
         """Logs a summary of the miner status in the subnet."""
-        relative_incentive = self.metagraph.I[self.uid].item() / max(self.metagraph.I)
-        incentive_and_hk = zip(self.metagraph.I, self.metagraph.hotkeys)
-        incentive_and_hk = sorted(incentive_and_hk, key=lambda x: x[0], reverse=True)
+        incentives = np.asarray(self.metagraph.I, dtype=np.float64)
+        relative_incentive = incentives[self.uid] / incentives.max()
+        # Stable sort keeps ties in uid order, matching a Python sort over (incentive, hotkey).
+        order = np.argsort(-incentives, kind="stable")
         position = -1
-        for i, (_, hk) in enumerate(incentive_and_hk):
-            if hk == self.wallet.hotkey.ss58_address:
-                position = i
-                break
+        my_uid = self._hotkey_to_uid.get(self.wallet.hotkey.ss58_address)
+        if my_uid is not None:
+            position = int(np.flatnonzero(order == my_uid)[0])
         log = (
             f"Step:{step} | "
             f"Block:{self.metagraph.block.item()} | "
@@ -467,13 +525,13 @@ class Miner:
 
     async def get_index(self, synapse: GetMinerIndex) -> GetMinerIndex:
         """Runs after the GetMinerIndex synapse has been deserialized (i.e. after synapse.data is available)."""
-        bt.logging.info(
+        self._log_info(
             f"Got to a GetMinerIndex request from {synapse.dendrite.hotkey}."
         )
 
         # Only synapse.version 4 is supported at this time.
         if synapse.version < 4:
-            bt.logging.error(f"Unsupported protocol version: {synapse.version}.")
+            self._log_error(f"Unsupported protocol version: {synapse.version}.")
             return synapse
 
         # Return the appropriate amount of max buckets based on protocol of the requesting validator.
@@ -481,7 +539,7 @@ class Miner:
             bucket_count_limit=constants.DATA_ENTITY_BUCKET_COUNT_LIMIT_PER_MINER_INDEX_PROTOCOL_4
         )
         synapse.compressed_index_serialized = compressed_index.model_dump_json()
-        bt.logging.success(
+        self._log_success(
             f"Returning compressed miner index of {CompressedMinerIndex.size_bytes(compressed_index)} bytes "
             + f"across {CompressedMinerIndex.bucket_count(compressed_index)} buckets to {synapse.dendrite.hotkey}."
         )
@@ -502,7 +560,7 @@ class Miner:
         self, synapse: GetDataEntityBucket
     ) -> GetDataEntityBucket:
         """Runs after the GetDataEntityBucket synapse has been deserialized (i.e. after synapse.data is available)."""
-        bt.logging.info(
+        self._log_info(
             f"Got to a GetDataEntityBucket request from {synapse.dendrite.hotkey} for Bucket ID: {str(synapse.data_entity_bucket_id)}."
         )
 
@@ -512,7 +570,7 @@ class Miner:
         )
         synapse.version = constants.PROTOCOL_VERSION
 
-        bt.logging.success(
+        self._log_success(
             f"Returning Bucket ID: {str(synapse.data_entity_bucket_id)} with {len(synapse.data_entities)} entities to {synapse.dendrite.hotkey}."
         )
 
@@ -749,16 +807,15 @@ class Miner:
         ip = synapse.dendrite.ip
         synapse_type = type(synapse)
 
-        if hotkey not in self.metagraph.hotkeys:
+        uid = self._hotkey_to_uid.get(hotkey)
+        if uid is None:
             # Ignore requests from unrecognized entities.
             return (
                 True,
                 f"Unrecognized hotkey {hotkey} at {ip}",
             )
 
-        uid = self.metagraph.hotkeys.index(hotkey)
-        
-        if not utils.is_validator(uid, self.metagraph, self.vpermit_rao_limit):
+        if not self._validator_mask[uid]:
             return (
                 True,
                 f"Hotkey {hotkey} at {ip} is not a validator",
@@ -769,7 +826,7 @@ class Miner:
             if (
                 dt.datetime.now() - self.last_cleared_request_limits
             ) >= constants.MIN_EVALUATION_PERIOD:
-                bt.logging.trace(
+                self._log_trace(
                     f"Clearing request limit counters by hotkey after an eval period: {constants.MIN_EVALUATION_PERIOD}."
                 )
                 for request_type in self.requests_by_type_by_hotkey:
@@ -802,11 +859,13 @@ class Miner:
 
     def default_priority(self, synapse: bt.Synapse) -> float:
         """The default priority that prioritizes by validator stake."""
-        caller_uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
+        caller_uid = self._hotkey_to_uid[synapse.dendrite.hotkey]
         priority = float(self.metagraph.S[caller_uid])
-        bt.logging.trace(
-            f"Prioritizing {synapse.dendrite.hotkey} with value: {priority}.",
-        )
+        # Skip formatting the message unless trace logging is actually on.
+        if utils.is_trace_logging_enabled():
+            self._log_trace(
+                f"Prioritizing {synapse.dendrite.hotkey} with value: {priority}.",
+            )
         return priority
 
     def get_config_for_test(self) -> bt.config:
@@ -834,8 +893,16 @@ class Miner:
             sys.exit(1)
 
 
+async def main():
+    async with Miner() as miner:
+        # Shut down cleanly on Ctrl+C or a termination request (e.g. from pm2).
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, miner.request_exit)
+
+        await miner.wait_for_exit_request()
+
+
 # This is the main function, which runs the miner.
 if __name__ == "__main__":
-    with Miner() as miner:
-        while True:
-            time.sleep(60)
+    asyncio.run(main())
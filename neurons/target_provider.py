@@ -1,5 +1,8 @@
 import os
+import copy
 import json
+import time
+import hashlib
 import logging
 import requests
 # --- CORRECTED: Import LabelScrapingConfig ---
@@ -11,7 +14,15 @@ logger = logging.getLogger(__name__)
 # --- Constants ---
 # The path to the file generated by the miner's --gravity feature.
 _DYNAMIC_TARGETS_FILE = os.path.expanduser('~/projects/data-universe/dynamic_desirability/total.json')
-CACHE_FILE_PATH = os.path.join(os.path.dirname(__file__), "cached_targets.json")
+_CACHE_FILE_PATH = os.path.join(os.path.dirname(__file__), "cached_targets.json")
+# Holds the hash of the cache file's contents, so unchanged targets are not rewritten.
+_CACHE_HASH_FILE_PATH = _CACHE_FILE_PATH + ".hash"
+# How long targets read from the dynamic source are reused in-process before the source is read again.
+TARGETS_TTL_SECONDS = 60
+
+# The most recent Tier 1 targets and the time.monotonic() at which they were fetched.
+_cached_targets = None
+_cached_targets_at = 0.0
 
 # =============================================================================
 # ==== Tier 3: Static Fallback Targets ====
@@ -112,14 +123,14 @@ def _fetch_from_dynamic_source():
 # =============================================================================
 # ==== Tier 2: Local Cache Operations ====
 # =============================================================================
-def _read_from_cache():
+def _read_from_local_cache():
     """Reads the cached targets and wraps them in the expected structure."""
-    if not os.path.exists(CACHE_FILE_PATH):
+    if not os.path.exists(_CACHE_FILE_PATH):
         logger.info("Local cache file does not exist. Skipping.")
         return None
     
     try:
-        with open(CACHE_FILE_PATH, 'r') as f:
+        with open(_CACHE_FILE_PATH, 'r') as f:
             cached_data = json.load(f)
         
         cached_configs = {
@@ -134,7 +145,7 @@ def _read_from_cache():
         return None
 
 
-def _write_to_cache(targets: dict):
+def _write_to_local_cache(targets: dict):
     """Writes the given targets to the local cache file, unwrapping them first."""
     try:
         configs_to_write = targets.get("scraper_configs", {})
@@ -146,9 +157,22 @@ def _write_to_cache(targets: dict):
             scraper_id: config.dict() for scraper_id, config in configs_to_write.items()
         }
         
+        serialized = json.dumps(targets_to_serialize, indent=4, sort_keys=True).encode('utf-8')
+        digest = hashlib.blake2b(serialized, digest_size=16).hexdigest()
+        if os.path.exists(_CACHE_FILE_PATH) and os.path.exists(_CACHE_HASH_FILE_PATH):
+            with open(_CACHE_HASH_FILE_PATH, 'r') as f:
+                if f.read() == digest:
+                    logger.info("Targets are unchanged since the last cache write. Skipping.")
+                    return
+
         logger.info(f"Attempting to write {len(targets_to_serialize)} targets to cache.")
-        with open(CACHE_FILE_PATH, 'w') as f:
-            json.dump(targets_to_serialize, f, indent=4)
+        # Write to a temporary file and swap it in, so a reader never sees a partially written cache.
+        tmp_path = _CACHE_FILE_PATH + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(serialized)
+        os.replace(tmp_path, _CACHE_FILE_PATH)
+        with open(_CACHE_HASH_FILE_PATH, 'w') as f:
+            f.write(digest)
         logger.info("Successfully updated local cache.")
     except Exception as e:
         logger.error(f"Failed to write to local cache. Reason: {e}")
@@ -159,17 +183,27 @@ def _write_to_cache(targets: dict):
 def get_scraping_targets():
     """
     Retrieves the list of scraping targets using a three-tiered fallback strategy.
+
+    Tier 1 targets are reused for TARGETS_TTL_SECONDS, so repeated calls skip both the source read and the
+    cache write. Fallback targets are never reused, so the dynamic source is retried on the next call.
+    Memoized targets are returned as deep copies, so a caller changing its ScraperConfigs cannot alter what
+    later callers get.
     """
+    global _cached_targets, _cached_targets_at
+    if _cached_targets is not None and time.monotonic() - _cached_targets_at < TARGETS_TTL_SECONDS:
+        return copy.deepcopy(_cached_targets)
+
     # TIER 1: Try Dynamic Source (with Hybrid Intelligence)
     try:
         targets = _fetch_from_dynamic_source()
-        _write_to_cache(targets)
-        return targets
+        _write_to_local_cache(targets)
+        _cached_targets, _cached_targets_at = targets, time.monotonic()
+        return copy.deepcopy(targets)
     except Exception as e:
         logger.warning(f"Dynamic source fetch failed: {e}. Falling back to local cache.")
 
     # TIER 2: Try Local Cache
-    targets = _read_from_cache()
+    targets = _read_from_local_cache()
     if targets:
         return targets
 
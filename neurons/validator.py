@@ -22,6 +22,7 @@ import numpy as np
 import asyncio
 import threading
 import time
+import traceback
 import os
 import wandb
 import subprocess
@@ -124,7 +125,8 @@ class Validator:
         self.organic_processor = None
 
         # Create asyncio event loop to manage async tasks.
-        self.loop = asyncio.get_event_loop()
+        # get_event_loop() is deprecated when there is no running loop, so create one explicitly.
+        self.loop = asyncio.new_event_loop()
         self.axon = None
         self.api = None
         self.step = 0
@@ -133,9 +135,15 @@ class Validator:
 
         # Instantiate runners
         self.should_exit: bool = False
+        # Set from other threads to cut short the run loop's wait between evaluation batches.
+        self._wake_event = asyncio.Event()
         self.is_running: bool = False
         self.thread: threading.Thread = None
+        self.block_subscription_thread: threading.Thread = None
         self.lock = threading.RLock()
+        # Latest block number pushed by the block header subscription, and when it was received.
+        self._latest_block: int = None
+        self._latest_block_time: float = 0.0
         self.last_eval_time = dt.datetime.utcnow()
         self.last_weights_set_time = dt.datetime.utcnow()
         self.is_setup = False
@@ -275,11 +283,15 @@ class Validator:
             }
             
             # Add individual miner scores
-            top_miners = torch.topk(scores, len(scores))
-            for i, (score, uid_idx) in enumerate(zip(top_miners.values, top_miners.indices)):
-                metrics[f"top_miner_{i+1}_uid"] = int(uid_idx.item())
-                metrics[f"top_miner_{i+1}_score"] = float(score.item())
-                metrics[f"top_miner_{i+1}_credibility"] = float(credibilities[uid_idx].item())
+            # Sort and gather once, then convert to Python lists, rather than unboxing each element.
+            top_scores, top_uids = torch.sort(scores, descending=True)
+            top_credibilities = credibilities[top_uids].tolist()
+            for i, (score, uid_idx, credibility) in enumerate(
+                zip(top_scores.tolist(), top_uids.tolist(), top_credibilities)
+            ):
+                metrics[f"top_miner_{i+1}_uid"] = uid_idx
+                metrics[f"top_miner_{i+1}_score"] = score
+                metrics[f"top_miner_{i+1}_credibility"] = credibility
             
             await self.mc_logger.log(metrics)
             
@@ -337,6 +349,9 @@ class Validator:
         """
         assert self.is_setup, "Validator must be setup before running."
 
+        # Make the validator's loop current for this thread, since run is usually started in a background thread.
+        asyncio.set_event_loop(self.loop)
+
         # Check that validator is registered on the network.
         utils.assert_registered(self.wallet, self.metagraph)
 
@@ -393,7 +408,7 @@ class Validator:
                     bt.logging.info(
                         f"Finished full evaluation loop early. Waiting {wait_time} seconds until running next evaluation loop."
                     )
-                    time.sleep(wait_time)
+                    self.loop.run_until_complete(self._cancellable_sleep(wait_time))
 
                 # Check if we should start a new wandb run.
                 if not self.config.wandb.off:
@@ -432,6 +447,21 @@ class Validator:
             except Exception as err:
                 bt.logging.error("Error during validation", str(err))
 
+    async def _cancellable_sleep(self, seconds: float):
+        """Sleeps for up to seconds, returning early if the validator is asked to stop."""
+        try:
+            await asyncio.wait_for(self._wake_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def _wake_run_thread(self):
+        """Wakes the run thread if it is waiting between evaluation batches."""
+        try:
+            self.loop.call_soon_threadsafe(self._wake_event.set)
+        except RuntimeError:
+            # The loop is already closed so there is nothing to wake.
+            pass
+
     def run_in_background_thread(self):
         """
         Starts the validator's operations in a background thread upon entering the context.
@@ -444,8 +474,13 @@ class Validator:
         if not self.is_running:
             bt.logging.debug("Starting validator in background thread.")
             self.should_exit = False
+            self._wake_event.clear()
             self.thread = threading.Thread(target=self.run, daemon=True)
             self.thread.start()
+            self.block_subscription_thread = threading.Thread(
+                target=self.subscribe_to_blocks, daemon=True
+            )
+            self.block_subscription_thread.start()
             self.is_running = True
             bt.logging.debug("Started.")
 
@@ -456,8 +491,11 @@ class Validator:
         if self.is_running:
             bt.logging.debug("Stopping validator in background thread.")
             self.should_exit = True
+            self._wake_run_thread()
             self.thread.join(5)
             self.is_running = False
+            # Flush the last queued evaluator state to disk.
+            self.evaluator.exit()
             bt.logging.debug("Stopped.")
 
     def __enter__(self):
@@ -480,21 +518,25 @@ class Validator:
         if self.is_running:
             bt.logging.debug("Stopping validator in background thread.")
             self.should_exit = True
+            self._wake_run_thread()
             self.thread.join(5)
             self.is_running = False
+            # Flush the last queued evaluator state to disk.
+            self.evaluator.exit()
 
             # Cleanup loggers
             if self.wandb_run:
                 self.wandb_run.finish()
             if self.mc_logger:
                 try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        # If loop is running, schedule the coroutine
-                        asyncio.create_task(self.finish_mc_logger_run())
+                    if self.loop.is_running():
+                        # If the run thread is still using the loop, schedule the coroutine on it.
+                        asyncio.run_coroutine_threadsafe(
+                            self.finish_mc_logger_run(), self.loop
+                        )
                     else:
                         # If loop is not running, run it
-                        loop.run_until_complete(self.finish_mc_logger_run())
+                        self.loop.run_until_complete(self.finish_mc_logger_run())
                 except Exception as e:
                     bt.logging.error(f"Error cleaning up Macrocosmos logger: {str(e)}")
             bt.logging.debug("Stopped.")
@@ -537,7 +579,8 @@ class Validator:
         """Processes an update to the metagraph"""
         with self.lock:
             assert netuid == self.config.netuid
-            self.metagraph = copy.deepcopy(metagraph)
+            # The syncer hands each listener a freshly fetched metagraph that is never mutated, so no copy is needed.
+            self.metagraph = metagraph
 
     def _on_eval_batch_complete(self):
         with self.lock:
@@ -641,26 +684,28 @@ class Validator:
         bt.logging.info("Attempting to set weights.")
 
         scorer = self.evaluator.get_scorer()
-        scores = scorer.get_scores()
+        # The score vector is tiny and lives on the CPU, so normalize it in numpy rather than torch.
+        scores = scorer.get_scores().numpy().astype(np.float32)
         credibilities = scorer.get_credibilities()
 
         # Check if scores contains any NaN values and log a warning if it does.
-        if torch.isnan(scores).any():
+        if np.isnan(scores).any():
             bt.logging.warning(
                 f"Scores contain NaN values. This may be due to a lack of responses from miners, or a bug in your reward functions."
             )
 
-        # Calculate the average reward for each uid across non-zero values.
-        # Replace any NaN values with 0.
-        raw_weights = torch.nn.functional.normalize(scores, p=1, dim=0)
+        # Replace any NaN values with 0 so they don't propagate into the weights.
+        np.nan_to_num(scores, copy=False)
+        # L1 normalize, with the same epsilon as torch.nn.functional.normalize.
+        raw_weights = scores / max(np.abs(scores).sum(), 1e-12)
 
         # Process the raw weights to final_weights via subtensor limitations.
         (
             processed_weight_uids,
             processed_weights,
         ) = bt.utils.weight_utils.process_weights_for_netuid(
-            uids=torch.tensor(self.metagraph.uids, dtype=torch.int64).to("cpu"),
-            weights=raw_weights.detach().cpu().numpy().astype(np.float32),
+            uids=np.asarray(self.metagraph.uids, dtype=np.int64),
+            weights=raw_weights,
             netuid=self.config.netuid,
             subtensor=self.subtensor,
             metagraph=self.metagraph,
@@ -678,12 +723,15 @@ class Validator:
         sorted_uids_and_weights = sorted(
             uids_and_weights, key=lambda x: x[1], reverse=True
         )
+        # Convert to Python lists once rather than unboxing an element per row.
+        score_values = scores.tolist()
+        credibility_values = credibilities.tolist()
         for uid, weight in sorted_uids_and_weights:
             table.add_row(
                 str(uid),
                 str(round(weight, 4)),
-                str(int(scores[uid].item())),
-                str(round(credibilities[uid].item(), 4)),
+                str(int(score_values[uid])),
+                str(round(credibility_values[uid], 4)),
             )
         console = Console()
         console.print(table)
@@ -703,8 +751,34 @@ class Validator:
 
         bt.logging.success("Finished setting weights.")
 
+    def subscribe_to_blocks(self):
+        """Keeps the latest block number up to date from pushed block headers instead of polling the chain."""
+        # Use a dedicated connection since the subscription blocks the websocket it runs on.
+        subtensor = bt.subtensor(config=self.config)
+
+        def on_block_header(obj, update_nr, subscription_id):
+            self._latest_block = obj["header"]["number"]
+            self._latest_block_time = time.monotonic()
+            # Returning a value ends the subscription.
+            return True if self.should_exit else None
+
+        while not self.should_exit:
+            try:
+                subtensor.substrate.subscribe_block_headers(on_block_header)
+            except Exception:
+                bt.logging.warning(
+                    f"Block header subscription failed. Retrying. {traceback.format_exc()}"
+                )
+                time.sleep(12)
+
     @property
     def block(self):
+        # Fall back to polling if the subscription hasn't delivered a block in the last few block times.
+        if (
+            self._latest_block is not None
+            and time.monotonic() - self._latest_block_time < 60
+        ):
+            return self._latest_block
         return utils.ttl_get_block(self)
 
     def save_state(self):
@@ -755,6 +829,18 @@ class Validator:
         return priority
 
 
+def _install_uvloop():
+    """Uses uvloop for every event loop created from here on, if it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        bt.logging.debug("uvloop is not installed. Using the default asyncio event loop.")
+        return
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    bt.logging.info("Using uvloop for the validator's event loops.")
+
+
 def main():
     """Main constructs the validator with its dependencies."""
 
@@ -763,6 +849,9 @@ def main():
 
     bt.logging(config=config, logging_dir=config.full_path)
 
+    # Must happen before the metagraph syncer, validator and evaluator threads create their loops.
+    _install_uvloop()
+
     subtensor = bt.subtensor(config=config)
     metagraph = subtensor.metagraph(netuid=config.netuid)
     wallet = bt.wallet(config=config)
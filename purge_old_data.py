@@ -8,6 +8,8 @@ import traceback
 # This path is typically defined in your miner's configuration.
 MINER_DB_PATH = 'miner_data.db' # Assumes the DB is in a 'data' subdirectory. Adjust as needed.
 DAYS_TO_KEEP = 30
+# Rows deleted per transaction, so the write lock is released between batches.
+PURGE_BATCH_SIZE = 10_000
 
 def purge_old_data(db_path: str, days_to_keep: int):
     """
@@ -25,6 +27,9 @@ def purge_old_data(db_path: str, days_to_keep: int):
     try:
         # The 'with' statement ensures the connection is closed automatically.
         with sqlite3.connect(db_path) as conn:
+            # WAL lets readers continue while the purge is running.
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
             cursor = conn.cursor()
 
             # Calculate the cutoff date. Any record with a timestamp before this will be deleted.
@@ -39,7 +44,11 @@ def purge_old_data(db_path: str, days_to_keep: int):
             timestamp_column = 'datetime' # This is the typical column name for timestamped data.
 
             sql_count_query = f"SELECT COUNT(*) FROM {table_name}"
-            sql_delete_query = f"DELETE FROM {table_name} WHERE {timestamp_column} <?"
+            sql_index_query = f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{timestamp_column} ON {table_name}({timestamp_column})"
+            sql_delete_query = (
+                f"DELETE FROM {table_name} WHERE rowid IN "
+                f"(SELECT rowid FROM {table_name} WHERE {timestamp_column} < ? LIMIT ?)"
+            )
 
             print(f"Connecting to database at {db_path}...")
 
@@ -52,15 +61,33 @@ def purge_old_data(db_path: str, days_to_keep: int):
                 print("Table is already empty. No action taken.")
                 return
 
+            # Index the timestamp so each batch below is an index range scan.
+            cursor.execute(sql_index_query)
+            conn.commit()
+
             print(f"Executing delete for records older than {days_to_keep} days (before {cutoff_iso_string})...")
 
             # Use a parameterized query to prevent SQL injection.
-            cursor.execute(sql_delete_query, (cutoff_iso_string,))
-
-            deleted_count = cursor.rowcount
-            conn.commit()
-
-            print(f"Successfully committed transaction. Deleted {deleted_count} records.")
+            # Delete in bounded batches, committing each one.
+            deleted_count = 0
+            while True:
+                cursor.execute(sql_delete_query, (cutoff_iso_string, PURGE_BATCH_SIZE))
+                conn.commit()
+                if cursor.rowcount <= 0:
+                    break
+                deleted_count += cursor.rowcount
+
+            print(f"Successfully committed batched deletes. Deleted {deleted_count} records.")
+
+            # Return the freed pages to the filesystem if the database uses incremental auto_vacuum
+            # (see scripts/setup_database.py). Other databases keep the pages for reuse.
+            cursor.execute("PRAGMA auto_vacuum")
+            if cursor.fetchone()[0] == 2:
+                while cursor.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+                    # executescript steps the pragma to completion; execute would only free a single page.
+                    conn.executescript("PRAGMA incremental_vacuum(1000);")
+                cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                print("Incremental vacuum complete.")
 
             # Get record count after deleting for final verification.
             cursor.execute(sql_count_query)
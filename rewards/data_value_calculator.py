@@ -1,4 +1,5 @@
 import datetime as dt
+import numpy as np
 from typing import Optional, List, Dict, Tuple
 from common.data import DataSource, TimeBucket, DateRange
 from common.data_v2 import ScorableDataEntityBucket
@@ -13,6 +14,52 @@ class DataValueCalculator:
     def __init__(self, model: DataDesirabilityLookup = data_desirability_lookup.LOOKUP):
         # Convert to primitive version for performance optimization
         self.model = model.to_primitive_data_desirability_lookup()
+
+        # Precompute the scale factors for each source and label, so scoring a bucket is a single lookup.
+        # Maps a data source to its weight multiplied by its default scale factor.
+        self._default_scale_factors: Dict[DataSource, float] = {}
+        # Maps a (source, label) pair to (source weight * job weight, start_timebucket, end_timebucket) for
+        # every job on that label. Only jobs without a keyword are scored.
+        self._job_scale_factors: Dict[
+            Tuple[DataSource, str], List[Tuple[float, Optional[int], Optional[int]]]
+        ] = {}
+        for source, desirability in self.model.distribution.items():
+            self._default_scale_factors[source] = (
+                desirability.weight * desirability.default_scale_factor
+            )
+            for job in desirability.jobs:
+                if job["keyword"] is not None:
+                    continue
+                self._job_scale_factors.setdefault((source, job["label"]), []).append(
+                    (
+                        desirability.weight * job["job_weight"],
+                        job.get("start_timebucket"),
+                        job.get("end_timebucket"),
+                    )
+                )
+
+        # Tables used to score many buckets at once in get_score_for_data_entity_buckets. They are indexed
+        # by data source rather than keyed by it, because hashing a DataSource enum runs in Python and
+        # would otherwise dominate the per-bucket cost.
+        # The default scale factors, indexed by data source.
+        self._default_scale_factor_list: List[float] = [0.0] * (max(DataSource) + 1)
+        for source, scale_factor in self._default_scale_factors.items():
+            self._default_scale_factor_list[source] = scale_factor
+        # For each data source, maps a label to the summed scale factor of its jobs, when none of them has
+        # a date range. Labels with a dated job map to inf, since they must be scored one bucket at a time.
+        undated_job_scale_factors: List[Dict[str, float]] = [
+            {} for _ in range(max(DataSource) + 1)
+        ]
+        for (source, label), jobs in self._job_scale_factors.items():
+            undated_job_scale_factors[source][label] = (
+                sum(scale_factor for scale_factor, _, _ in jobs)
+                if all(start is None and end is None for _, start, end in jobs)
+                else np.inf
+            )
+        # Stored as each dict's bound get, to skip the attribute lookup per bucket.
+        self._undated_job_scale_factor_getters = [
+            scale_factors.get for scale_factors in undated_job_scale_factors
+        ]
     
     
     def get_score_for_data_entity_bucket(
@@ -23,7 +70,6 @@ class DataValueCalculator:
         """Returns the score for the given data entity bucket."""
         # Extract frequently used values
         time_bucket_id = scorable_data_entity_bucket.time_bucket_id
-        label = scorable_data_entity_bucket.label
         source = scorable_data_entity_bucket.source
         
         # Calculate time scalar
@@ -33,52 +79,94 @@ class DataValueCalculator:
         
         # Find matching jobs directly using time bucket ID
         # Currently only finds matching jobs where keyword is None.
-        matching_jobs = self.model.find_matching_jobs(source, None, label, time_bucket_id)
-        
-        # Rest of method remains the same...
-        
-        data_source_weight = self.model.get_data_source_weight(scorable_data_entity_bucket.source)
-        
-        if matching_jobs:
-            # Calculate score based on matching jobs
+        jobs = self._job_scale_factors.get((source, scorable_data_entity_bucket.label))
+        if jobs:
+            # Calculate score based on the jobs whose date range, if any, contains the time bucket.
             total_score = 0.0
-            for job in matching_jobs:
-                # Get job weight
-                job_weight = job["job_weight"]
-                
-                # Calculate time scalar
-                if job["start_timebucket"] or job["end_timebucket"]:
-                    # For jobs with date constraints, if we've reached here, the time bucket
-                    # overlaps with the job's date range, so use full time scalar of 1.0
-                    time_scalar = 1.0
-                else:
-                    # For jobs without date constraints, use linear depreciation
-                    time_scalar = self._scale_factor_for_age(
-                        scorable_data_entity_bucket.time_bucket_id, 
-                        current_time_bucket.id
-                    )
-                
+            matched = False
+            for scale_factor, start_timebucket, end_timebucket in jobs:
+                if start_timebucket is not None and time_bucket_id < start_timebucket:
+                    continue  # Data is before job's start time
+                if end_timebucket is not None and time_bucket_id > end_timebucket:
+                    continue  # Data is after job's end time
+                matched = True
+
+                # For jobs with date constraints, if we've reached here, the time bucket
+                # overlaps with the job's date range, so use full time scalar of 1.0.
+                # For jobs without date constraints, use linear depreciation.
+                job_time_scalar = 1.0 if start_timebucket or end_timebucket else time_scalar
+
                 # Add this job's contribution to total score
-                contribution = data_source_weight * job_weight * time_scalar * scorable_data_entity_bucket.scorable_bytes
-                total_score += contribution
-            
-            return total_score
-        else:
-            # No matching jobs - use default scale factor
-            default_scale_factor = self.model.get_default_scale_factor(scorable_data_entity_bucket.source)
-            time_scalar = self._scale_factor_for_age(
-                scorable_data_entity_bucket.time_bucket_id, 
-                current_time_bucket.id
-            )
-            
-            return (
-                data_source_weight
-                * default_scale_factor
-                * time_scalar
-                * scorable_data_entity_bucket.scorable_bytes
-            )
+                total_score += (
+                    scale_factor * job_time_scalar * scorable_data_entity_bucket.scorable_bytes
+                )
+
+            if matched:
+                return total_score
+
+        # No matching jobs - use default scale factor
+        return (
+            self._default_scale_factors.get(source, 0.0)
+            * time_scalar
+            * scorable_data_entity_bucket.scorable_bytes
+        )
     
     
+    def get_score_for_data_entity_buckets(
+        self,
+        scorable_data_entity_buckets: List[ScorableDataEntityBucket],
+        current_time_bucket: TimeBucket
+    ) -> float:
+        """Returns the total score for the given data entity buckets.
+
+        Equivalent to summing get_score_for_data_entity_bucket over the buckets, but computed as one
+        vectorized pass over arrays of the buckets' fields.
+        """
+        count = len(scorable_data_entity_buckets)
+        if count == 0:
+            return 0.0
+
+        time_bucket_ids = np.fromiter(
+            (bucket.time_bucket_id for bucket in scorable_data_entity_buckets),
+            dtype=np.int64,
+            count=count,
+        )
+        scorable_bytes = np.fromiter(
+            (bucket.scorable_bytes for bucket in scorable_data_entity_buckets),
+            dtype=np.float64,
+            count=count,
+        )
+        # Buckets without a job use their source's default scale factor.
+        job_scale_factor_getters = self._undated_job_scale_factor_getters
+        default_scale_factors = self._default_scale_factor_list
+        scale_factors = np.fromiter(
+            (
+                job_scale_factor_getters[bucket.source](
+                    bucket.label, default_scale_factors[bucket.source]
+                )
+                for bucket in scorable_data_entity_buckets
+            ),
+            dtype=np.float64,
+            count=count,
+        )
+
+        # Linear depreciation by age, matching _scale_factor_for_age.
+        max_age_in_hours = self.model.max_age_in_hours
+        ages = np.maximum(0, current_time_bucket.id - time_bucket_ids)
+        time_scalars = np.where(
+            ages > max_age_in_hours, 0.0, 1.0 - ages / (2 * max_age_in_hours)
+        )
+
+        # Buckets on a label with a dated job are scored individually.
+        dated = np.isinf(scale_factors)
+        scale_factors[dated] = 0.0
+        total_score = float(np.sum(scale_factors * time_scalars * scorable_bytes))
+        for i in np.flatnonzero(dated):
+            total_score += self.get_score_for_data_entity_bucket(
+                scorable_data_entity_buckets[i], current_time_bucket
+            )
+        return total_score
+
     def _scale_factor_for_age(
         self, time_bucket_id: int, current_time_bucket_id: int
     ) -> float:
@@ -1,8 +1,10 @@
 import threading
-from typing import List, Optional
+from typing import Dict, List, Optional
+import numpy as np
 import torch
 import bittensor as bt
 import datetime as dt
+from common import utils
 from common.data import TimeBucket
 from common.data_v2 import ScorableMinerIndex
 from rewards.data_value_calculator import DataValueCalculator
@@ -29,6 +31,22 @@ class MinerScorer:
 
     ONDEMAND_MAX_CRED_PENALTY = 0.05
 
+    # The per-miner state tensors, with the value a new miner starts at.
+    _PER_MINER_STATE = (
+        # Tracks the raw scores of each miner. i.e. not the weights that are set on the blockchain.
+        ("scores", 0.0),
+        # Credibilities are flat (num_neurons,) vectors, since they are only ever indexed per miner.
+        ("miner_credibility", STARTING_CREDIBILITY),
+        # Keeps track of the amount of scorable bytes the miner had last time it was evaluated.
+        ("scorable_bytes", 0.0),
+        # Keeps track of the miner's current HF boost based on the last HF evaluation.
+        ("hf_boosts", 0.0),
+        ("hf_credibility", STARTING_HF_CREDIBILITY),
+        # Keeps track of the miner's current S3 boost based on the last S3 evaluation.
+        ("s3_boosts", 0.0),
+        ("s3_credibility", STARTING_S3_CREDIBILITY),
+    )
+
     def __init__(
         self,
         num_neurons: int,
@@ -37,69 +55,130 @@ class MinerScorer:
         hf_cred_alpha: float = 0.20,
         s3_cred_alpha: float = 0.20
     ):
-        # Tracks the raw scores of each miner. i.e. not the weights that are set on the blockchain.
-        self.scores = torch.zeros(num_neurons, dtype=torch.float32)
-        self.miner_credibility = torch.full(
-            (num_neurons, 1), MinerScorer.STARTING_CREDIBILITY, dtype=torch.float32
-        )
-        # Keeps track of the amount of scorable bytes the miner had last time it was evaluated.
-        self.scorable_bytes = torch.zeros(num_neurons, dtype=torch.float32)
+        # Each per-miner tensor is a view over the first num_neurons entries of an over-allocated backing
+        # tensor, so that growing the number of neurons only occasionally reallocates and copies.
+        self._capacity = 0
+        self._backing: Dict[str, torch.Tensor] = {}
+        self._set_num_neurons(num_neurons)
+
         self.value_calculator = value_calculator
         self.cred_alpha = cred_alpha
-
-        # Keeps track of the miner's current HF boost based on the last HF evaluation.
-        self.hf_boosts = torch.zeros(num_neurons, dtype=torch.float32)
-        self.hf_credibility = torch.full(
-            (num_neurons, 1), MinerScorer.STARTING_HF_CREDIBILITY, dtype=torch.float32
-        )
+        self._one_minus_cred_alpha = 1.0 - cred_alpha
         self.hf_cred_alpha = hf_cred_alpha
-
-        # Keeps track of the miner's current S3 boost based on the last S3 evaluation.
-        self.s3_boosts = torch.zeros(num_neurons, dtype=torch.float32)
-        self.s3_credibility = torch.full(
-            (num_neurons, 1), MinerScorer.STARTING_S3_CREDIBILITY, dtype=torch.float32
-        )
         self.s3_cred_alpha = s3_cred_alpha
 
         # Make this class thread safe because it'll eventually be accessed by multiple threads.
         # One from the main validator evaluation loop and another from a background thread performing validation on user requests.
         self.lock = threading.Lock()
 
-    def save_state(self, filepath):
-        """Save the current state to the provided filepath."""
+    def state_arrays(self) -> Dict[str, np.ndarray]:
+        """Returns a copy of the scorer's state as numpy arrays, keyed by name."""
         with self.lock:
-            torch.save(
-                {
-                    "scores": self.scores,
-                    "credibility": self.miner_credibility,
-                    "hf_boosts": self.hf_boosts,
-                    "hf_credibility": self.hf_credibility,
-                    "s3_boosts": self.s3_boosts,
-                    "s3_credibility": self.s3_credibility,
-                    "scorable_bytes": self.scorable_bytes,
-                },
-                filepath,
-            )
+            return {
+                "scores": self.scores.numpy().copy(),
+                "credibility": self.miner_credibility.numpy().copy(),
+                "hf_boosts": self.hf_boosts.numpy().copy(),
+                "hf_credibility": self.hf_credibility.numpy().copy(),
+                "s3_boosts": self.s3_boosts.numpy().copy(),
+                "s3_credibility": self.s3_credibility.numpy().copy(),
+                "scorable_bytes": self.scorable_bytes.numpy().copy(),
+            }
+
+    @staticmethod
+    def write_state_arrays(filepath, arrays: Dict[str, np.ndarray]):
+        """Writes state returned by state_arrays to the provided filepath as an npz archive."""
+        # Write through a file object so numpy doesn't append '.npz' to the filepath.
+        with open(filepath, "wb") as f:
+            np.savez_compressed(f, **arrays)
+
+    def save_state(self, filepath):
+        """Save the current state to the provided filepath as an npz archive."""
+        MinerScorer.write_state_arrays(filepath, self.state_arrays())
 
     def load_state(self, filepath):
-        """Load the state from the provided filepath."""
-        state = torch.load(filepath, weights_only=True)
+        """Load the state from the provided filepath.
+
+        Accepts both npz archives written by save_state and legacy torch.save files.
+        """
+        state = None
+        try:
+            with np.load(filepath, allow_pickle=False) as archive:
+                if "scores" in archive.files:
+                    state = {
+                        name: torch.from_numpy(archive[name]) for name in archive.files
+                    }
+        except ValueError:
+            # Not an npz archive.
+            pass
+
+        if state is None:
+            # Files written before the switch to npz were saved with torch.save. Memory map them
+            # rather than reading the whole file, falling back for files in the pre-zip format.
+            try:
+                state = torch.load(filepath, mmap=True, weights_only=True)
+            except RuntimeError:
+                state = torch.load(filepath, weights_only=True)
+
         with self.lock:
-            self.scores = state["scores"]
-            self.miner_credibility = state["credibility"]
-            self.hf_boosts = state["hf_boosts"]
-            self.hf_credibility = state["hf_credibility"]
+            self.scores = MinerScorer._restore_tensor(self.scores, state["scores"])
+            # Credibilities used to be saved as (num_neurons, 1) columns, so they are flattened on restore.
+            self.miner_credibility = MinerScorer._restore_tensor(
+                self.miner_credibility, state["credibility"]
+            )
+            self.hf_boosts = MinerScorer._restore_tensor(
+                self.hf_boosts, state["hf_boosts"]
+            )
+            self.hf_credibility = MinerScorer._restore_tensor(
+                self.hf_credibility, state["hf_credibility"]
+            )
             # Handle backward compatibility for S3 fields
-            self.s3_boosts = state.get("s3_boosts", torch.zeros_like(self.scores))
-            self.s3_credibility = state.get("s3_credibility", torch.full(
-                (self.scores.size(0), 1), MinerScorer.STARTING_S3_CREDIBILITY, dtype=torch.float32
-            ))
+            self.s3_boosts = MinerScorer._restore_tensor(
+                self.s3_boosts, state.get("s3_boosts", torch.zeros_like(self.scores))
+            )
+            self.s3_credibility = MinerScorer._restore_tensor(
+                self.s3_credibility,
+                state.get("s3_credibility", torch.full(
+                    (self.scores.size(0),), MinerScorer.STARTING_S3_CREDIBILITY, dtype=torch.float32
+                )),
+            )
+            self.scorable_bytes = MinerScorer._restore_tensor(
+                self.scorable_bytes,
+                state.get("scorable_bytes", torch.zeros_like(self.scores)),
+            )
+
+            # Tensors that were cloned rather than copied in place no longer view the backing tensors,
+            # so reallocate them around the loaded state.
+            self._capacity = 0
+            self._set_num_neurons(self.scores.size(0))
+
+    @staticmethod
+    def _restore_tensor(current: torch.Tensor, loaded: torch.Tensor) -> torch.Tensor:
+        """Returns the loaded state as a flat tensor owned by the scorer.
+
+        The loaded values are copied into current when the sizes match, reusing its storage. Otherwise
+        they are cloned. Either way the result never shares storage with a memory mapped state file,
+        which is rewritten by later saves.
+        """
+        loaded = loaded.reshape(-1)
+        if loaded.shape == current.shape:
+            return current.copy_(loaded)
+        return loaded.to(dtype=torch.float32, copy=True)
 
     def get_scores(self) -> torch.Tensor:
         """Returns the raw scores of all miners."""
+        # Read the published snapshot without the lock. Reading the reference is atomic, and the
+        # snapshot is never mutated once published.
         # Return a copy to ensure outside code can't modify the scores.
-        with self.lock:
-            return self.scores.clone()
+        return self._scores_snapshot.clone()
+
+    def _publish_scores(self) -> None:
+        """Publishes a copy of the current scores for get_scores to read without the lock.
+
+        Must be called after every change to self.scores.
+
+        Requires: self.lock is held, or the scorer is being constructed.
+        """
+        self._scores_snapshot = self.scores.clone()
 
     def get_credibilities(self) -> torch.Tensor:
         """Returns the raw credibilities of all miners."""
@@ -116,6 +195,7 @@ class MinerScorer:
             self.hf_credibility[uid] = MinerScorer.STARTING_HF_CREDIBILITY
             self.s3_boosts[uid] = 0.0
             self.s3_credibility[uid] = MinerScorer.STARTING_S3_CREDIBILITY
+            self._publish_scores()
 
     def get_miner_credibility(self, uid: int) -> float:
         """Returns the credibility of miner 'uid'."""
@@ -136,55 +216,36 @@ class MinerScorer:
                 f"Resizing MinerScorer from {self.scores.size(0)} to {num_neurons}"
             )
 
-            to_add = num_neurons - self.scores.size(0)
-            self.scores = torch.cat(
-                [self.scores, torch.zeros(to_add, dtype=torch.float32)]
-            )
-            self.miner_credibility = torch.cat(
-                [
-                    self.miner_credibility,
-                    torch.full(
-                        (to_add, 1),
-                        MinerScorer.STARTING_CREDIBILITY,
-                        dtype=torch.float32,
-                    ),
-                ]
-            )
-            self.scorable_bytes = torch.cat(
-                [self.scorable_bytes, torch.zeros(to_add, dtype=torch.float32)]
-            )
-            self.hf_boosts = torch.cat(
-                [self.hf_boosts, torch.zeros(to_add, dtype=torch.float32)]
-            )
-            self.hf_credibility = torch.cat(
-                [
-                    self.hf_credibility,
-                    torch.full(
-                        (to_add, 1),
-                        MinerScorer.STARTING_HF_CREDIBILITY,
-                        dtype=torch.float32,
-                    ),
-                ]
-            )
-            self.s3_boosts = torch.cat(
-                [self.s3_boosts, torch.zeros(to_add, dtype=torch.float32)]
-            )
-            self.s3_credibility = torch.cat(
-                [
-                    self.s3_credibility,
-                    torch.full(
-                        (to_add, 1),
-                        MinerScorer.STARTING_S3_CREDIBILITY,
-                        dtype=torch.float32,
-                    ),
-                ]
-            )
+            self._set_num_neurons(num_neurons)
+
+    def _set_num_neurons(self, num_neurons: int) -> None:
+        """Points each per-miner tensor at the first num_neurons entries of its backing tensor.
+
+        The backing tensors are reallocated, doubling in size, only when num_neurons exceeds their
+        capacity. Entries past the current number of neurons keep their starting values.
+
+        Requires: self.lock is held, or the scorer is being constructed.
+        """
+        if num_neurons > self._capacity:
+            capacity = 1 << (max(num_neurons, 1) - 1).bit_length()
+            for name, starting_value in MinerScorer._PER_MINER_STATE:
+                backing = torch.full((capacity,), starting_value, dtype=torch.float32)
+                current = getattr(self, name, None)
+                if current is not None:
+                    backing[: current.size(0)] = current
+                self._backing[name] = backing
+            self._capacity = capacity
+
+        for name, _ in MinerScorer._PER_MINER_STATE:
+            setattr(self, name, self._backing[name][:num_neurons])
+        self._publish_scores()
 
     def update_hf_boost_and_cred(self, uid: int, hf_vali_percentage: float) -> None:
         """Applies a fixed boost to the scaled score if the miner has passed HF validation."""
         max_boost = 10 * 10**6
         self.hf_boosts[uid] = hf_vali_percentage/100 * max_boost
-        self.hf_credibility[uid] = min(1, hf_vali_percentage/100 * self.hf_cred_alpha + (1-self.hf_cred_alpha) * self.hf_credibility[uid])
+        # Computed on Python floats so no intermediate tensors are created.
+        self.hf_credibility[uid] = min(1, hf_vali_percentage/100 * self.hf_cred_alpha + (1-self.hf_cred_alpha) * self.hf_credibility[uid].item())
         bt.logging.info(
             f"After HF evaluation for miner {uid}: Raw HF Boost = {float(self.hf_boosts[uid])}. HF Credibility = {float(self.hf_credibility[uid])}."
         )
@@ -193,7 +254,8 @@ class MinerScorer:
         """Applies a fixed boost to the scaled score if the miner has passed S3 validation."""
         max_boost = 10 * 10**6  # Half of HF boost since S3 is simpler validation
         self.s3_boosts[uid] = s3_vali_percentage/100 * max_boost
-        self.s3_credibility[uid] = min(1, s3_vali_percentage/100 * self.s3_cred_alpha + (1-self.s3_cred_alpha) * self.s3_credibility[uid])
+        # Computed on Python floats so no intermediate tensors are created.
+        self.s3_credibility[uid] = min(1, s3_vali_percentage/100 * self.s3_cred_alpha + (1-self.s3_cred_alpha) * self.s3_credibility[uid].item())
         bt.logging.info(
             f"After S3 evaluation for miner {uid}: Raw S3 Boost = {float(self.s3_boosts[uid])}. S3 Credibility = {float(self.s3_credibility[uid])}."
         )
@@ -202,17 +264,18 @@ class MinerScorer:
         """Applies a credibility penalty to a given miner based on their ondemand result"""
         with self.lock:
             cred_penalty = MinerScorer.ONDEMAND_MAX_CRED_PENALTY * mult_factor
-            old_cred = float(self.miner_credibility[uid])
+            old_cred = self.miner_credibility[uid].item()
             
             # Apply credibility penalty
-            self.miner_credibility[uid] = max(self.miner_credibility[uid] - cred_penalty, 0)
-            new_cred = float(self.miner_credibility[uid])
+            self.miner_credibility[uid] = max(old_cred - cred_penalty, 0)
+            new_cred = self.miner_credibility[uid].item()
             
             # Adjust score based on the credibility ratio change
             if old_cred > 0:
                 cred_ratio = (new_cred / old_cred) ** MinerScorer._CREDIBILITY_EXP
-                old_score = float(self.scores[uid])
-                self.scores[uid] *= cred_ratio
+                old_score = self.scores[uid].item()
+                self.scores[uid] = old_score * cred_ratio
+                self._publish_scores()
                 
                 bt.logging.info(
                     f"OnDemand penalty for Miner {uid}: "
@@ -236,22 +299,25 @@ class MinerScorer:
             validation_results (List[ValidationResult]): The results of data validation performed on the data provided by the miner.
             hf_validation_result (Optional, HFValidationResult): The overall result from a validation process on a 10,000 row sample from a miner's HF dataset. 
         """
-        with self.lock:
-            score = 0.0
+        score = 0.0
+
+        # Compute the raw miner score based on the amount of data it has, scaled based on
+        # the reward distribution. This only reads the index and value calculator, so it is done
+        # before taking the lock to keep the critical section to the per-miner state updates.
+        if index:
+            # Bind the calculator once, since the validator may swap it out for an updated one.
+            value_calculator = self.value_calculator
+            current_time_bucket = TimeBucket.from_datetime(
+                dt.datetime.now(tz=dt.timezone.utc)
+            )
+            score = value_calculator.get_score_for_data_entity_buckets(
+                index.scorable_data_entity_buckets, current_time_bucket
+            )
 
+        with self.lock:
             # If the miner has an index, update it's credibility based on the validation result and score the current index.
             # Otherwise, score the miner 0 for this round, but don't touch its credibility.
             if index:
-                # Compute the raw miner score based on the amount of data it has, scaled based on
-                # the reward distribution.
-                current_time_bucket = TimeBucket.from_datetime(
-                    dt.datetime.now(tz=dt.timezone.utc)
-                )
-                for bucket in index.scorable_data_entity_buckets:
-                    score += self.value_calculator.get_score_for_data_entity_bucket(
-                        bucket, current_time_bucket
-                    )
-
                 # If the score has increased since the last eval, decrease credibility so that the
                 # new score remains unchanged. i.e. "you've told us you now have more valuable data, prove it".
                 # Note: After this step we then update the miner's credibility again, so if they passed
@@ -263,20 +329,21 @@ class MinerScorer:
                         1 / MinerScorer._CREDIBILITY_EXP
                     )
                     self.miner_credibility[uid] *= cred_scalar
-                    bt.logging.debug(
-                        f"Miner {uid}'s scorable bytes changed from {previous_raw_score} to {score}. Credibility changed from {previous_cred} to {self.miner_credibility[uid].item()}."
-                    )
+                    if utils.is_debug_logging_enabled():
+                        bt.logging.debug(
+                            f"Miner {uid}'s scorable bytes changed from {previous_raw_score} to {score}. Credibility changed from {previous_cred} to {self.miner_credibility[uid].item()}."
+                        )
 
                 # Record raw score for next time.
                 self.scorable_bytes[uid] = score
                 
                 # Awarding the miner their HF boost based on their last HF evaluation. 
-                hf_boost = self.hf_boosts[uid] * self.hf_credibility[uid]
+                hf_boost = self.hf_boosts[uid].item() * self.hf_credibility[uid].item()
                 score += hf_boost
                 bt.logging.info(f"Awarded Miner {uid} a HF boost of {float(hf_boost)} based off of the last performed HF evaluation.")
                 
                 # Awarding the miner their S3 boost based on their last S3 evaluation.
-                s3_boost = self.s3_boosts[uid] * self.s3_credibility[uid]
+                s3_boost = self.s3_boosts[uid].item() * self.s3_credibility[uid].item()
                 score += s3_boost
                 bt.logging.info(f"Awarded Miner {uid} a S3 boost of {float(s3_boost)} based off of the last performed S3 evaluation, adjusting the score to {float(score)}.")
 
@@ -284,9 +351,11 @@ class MinerScorer:
                 self._update_credibility(uid, validation_results)
 
                 # Finally, scale the miner's score by its credibility to the power of 2.5.
-                score *= self.miner_credibility[uid] ** MinerScorer._CREDIBILITY_EXP
+                # Done on a Python float so no intermediate tensors are created.
+                score *= self.miner_credibility[uid].item() ** MinerScorer._CREDIBILITY_EXP
 
             self.scores[uid] = score
+            self._publish_scores()
 
             bt.logging.success(
                 f"Evaluated Miner {uid}. Score={self.scores[uid].item()}. Credibility={self.miner_credibility[uid].item()}."
@@ -301,28 +370,32 @@ class MinerScorer:
             len(validation_results) > 0
         ), "Must be provided at least 1 validation result."
 
-        # Weight the current set of validation_results by the total content size validaed
-        total_bytes_validated = sum(
-            result.content_size_bytes_validated for result in validation_results
-        )
+        # Weight the current set of validation_results by the total content size validaed.
+        # Both totals are accumulated in a single pass over the results.
+        total_bytes_validated = 0
+        valid_bytes_validated = 0
+        for result in validation_results:
+            content_size_bytes_validated = result.content_size_bytes_validated
+            total_bytes_validated += content_size_bytes_validated
+            if result.is_valid:
+                valid_bytes_validated += content_size_bytes_validated
 
         credibility = 0
 
         if total_bytes_validated > 0:
-            credibility = sum(
-                result.is_valid * result.content_size_bytes_validated
-                for result in validation_results
-            ) / float(total_bytes_validated)
+            credibility = valid_bytes_validated / float(total_bytes_validated)
 
-        previous_credibility = self.miner_credibility[uid].clone().item()
+        trace_logging_enabled = utils.is_trace_logging_enabled()
+        if trace_logging_enabled:
+            previous_credibility = self.miner_credibility[uid].item()
 
-        # Use EMA to update the miner's credibility.
-        self.miner_credibility[uid] = (
+        # Use EMA to update the miner's credibility, in place on the miner's row.
+        self.miner_credibility[uid].mul_(self._one_minus_cred_alpha).add_(
             self.cred_alpha * credibility
-            + (1 - self.cred_alpha) * self.miner_credibility[uid]
         )
 
-        bt.logging.trace(
-            f"""Evaluated Miner {uid}. Percent of bytes validated succesfully this attempt={credibility * 100}. 
-                Previous Credibility={previous_credibility}. New Credibility={self.miner_credibility[uid].item()}."""
-        )
+        if trace_logging_enabled:
+            bt.logging.trace(
+                f"""Evaluated Miner {uid}. Percent of bytes validated succesfully this attempt={credibility * 100}. 
+                    Previous Credibility={previous_credibility}. New Credibility={self.miner_credibility[uid].item()}."""
+            )
@@ -1,5 +1,5 @@
 import asyncio
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 import configparser
 
 class ApifyScraper:
@@ -7,7 +7,9 @@ class ApifyScraper:
     A unified client for running scrapers ("Actors") on the Apify platform.
     """
     def __init__(self, api_token: str):
-        self.client = ApifyClient(api_token)
+        # Use the async client so actor runs are awaited on the event loop instead of blocking a
+        # worker thread each, and several runs can be gathered concurrently.
+        self.client = ApifyClientAsync(api_token)
         print("ApifyScraper initialized.")
 
     async def run_actor(self, actor_id: str, actor_input: dict) -> list:
@@ -16,14 +18,12 @@ class ApifyScraper:
         """
         try:
             print(f"Starting Apify Actor: {actor_id}...")
-            run = await asyncio.to_thread(self.client.actor(actor_id).call, run_input=actor_input)
+            run = await self.client.actor(actor_id).call(run_input=actor_input)
             
             print(f"Actor {actor_id} finished. Fetching results...")
-            items = []
-            dataset = await asyncio.to_thread(self.client.dataset(run["defaultDatasetId"]).list_items)
-            
-            for item in dataset.items:
-                items.append(item)
+            dataset = await self.client.dataset(run["defaultDatasetId"]).list_items()
+            # Return the fetched page directly rather than copying it into a second list.
+            items = dataset.items
             
             print(f"Successfully fetched {len(items)} items from Actor {actor_id}.")
             return items
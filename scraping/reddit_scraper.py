@@ -26,16 +26,21 @@ class RedditScraper:
         try:
             print(f"Fetching {limit} posts from r/{subreddit_name}...")
             subreddit = await self.reddit.subreddit(subreddit_name)
-            posts_data = []
-            async for submission in subreddit.hot(limit=limit):
-                posts_data.append({
+            # The listing is fetched a page at a time and each submission arrives with its fields loaded,
+            # so the only awaits are the page requests. Collect the submissions first, then read their
+            # fields without suspending between items.
+            submissions = [submission async for submission in subreddit.hot(limit=limit)]
+            posts_data = [
+                {
                     'id': submission.id,
                     'title': submission.title,
                     'score': submission.score,
                     'url': submission.url,
                     'selftext': submission.selftext,
                     'created_utc': submission.created_utc
-                })
+                }
+                for submission in submissions
+            ]
             print(f"Successfully fetched {len(posts_data)} posts.")
             return posts_data
         except Exception as e:
@@ -1,4 +1,5 @@
 import datetime as dt
+import operator
 import re
 import traceback
 import bittensor as bt
@@ -124,7 +125,8 @@ def are_hashtags_valid(tweet_to_verify_hashtags: List, actual_tweet_hashtags: Li
 
 def hf_tweet_validation(validation_results: List[ValidationResult]):
     total_count = len(validation_results)
-    true_count = sum(1 for item in validation_results if item.is_valid)
+    # Count in C rather than through a generator frame per result.
+    true_count = sum(map(operator.attrgetter("is_valid"), validation_results))
     true_percentage = (true_count / total_count) * 100
 
     return true_percentage >= 50, true_percentage
@@ -482,7 +482,8 @@ class YouTubeChannelTranscriptScraper(Scraper):
             except Exception:
                 validation_results.append(False)
 
-        valid_count = sum(1 for result in validation_results if result)
+        # The results are plain bools, so count them in C rather than through a generator.
+        valid_count = validation_results.count(True)
         validation_percentage = (valid_count / len(validation_results)) * 100 if validation_results else 0
 
         return HFValidationResult(
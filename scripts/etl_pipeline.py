@@ -1,6 +1,10 @@
 import os
 import sys
 import json
+import re
+import functools
+import itertools
+import concurrent.futures
 import logging
 import traceback
 import datetime as dt
@@ -18,75 +22,168 @@ from storage.miner.sqlite_miner_storage import PostgresMinerStorage
 logging.basicConfig(level=logging.INFO, format='🚚 ETL: %(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
 
 APIFY_TOKEN = os.getenv("APIFY_TOKEN")
+# The number of dataset items transformed and stored at a time.
+ETL_BATCH_SIZE = 10_000
+# The maximum number of runs processed at once.
+MAX_CONCURRENT_ETL_RUNS = 8
 
-def parse_datetime(datetime_str: str) -> dt.datetime:
-    for fmt in ('%a %b %d %H:%M:%S %z %Y',):
+# The format of Twitter's created_at timestamps, e.g. 'Wed Oct 10 20:19:24 +0000 2018'.
+TWITTER_DATETIME_FORMAT = '%a %b %d %H:%M:%S %z %Y'
+# Matches TWITTER_DATETIME_FORMAT, so its fields can be read directly rather than through strptime.
+TWITTER_DATETIME_RE = re.compile(r'[A-Z][a-z]{2} ([A-Z][a-z]{2}) (\d\d) (\d\d):(\d\d):(\d\d) ([+-])(\d\d)(\d\d) (\d{4})')
+TWITTER_MONTHS = {month: i for i, month in enumerate(('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1)}
+
+def _parse_twitter_datetime(datetime_str: str) -> dt.datetime | None:
+    match = TWITTER_DATETIME_RE.fullmatch(datetime_str)
+    if match is None:
+        return None
+    month, day, hour, minute, second, sign, tz_hours, tz_minutes, year = match.groups()
+    month = TWITTER_MONTHS.get(month)
+    if month is None:
+        return None
+    offset = dt.timedelta(hours=int(tz_hours), minutes=int(tz_minutes))
+    tzinfo = dt.timezone(-offset if sign == '-' else offset) if offset else dt.timezone.utc
+    try:
+        return dt.datetime(int(year), month, int(day), int(hour), int(minute), int(second), tzinfo=tzinfo)
+    except ValueError:
+        return None
+
+# The number of distinct timestamp strings whose parsed datetimes are kept. Items scraped in the same
+# second share a timestamp, so repeated strings are common within a run.
+PARSE_DATETIME_CACHE_SIZE = 65536
+
+@functools.lru_cache(maxsize=PARSE_DATETIME_CACHE_SIZE)
+def _parse_datetime_str(datetime_str: str) -> dt.datetime | None:
+    # Twitter timestamps start with the weekday name, while ISO 8601 ones start with the year, so pick
+    # the parser up front instead of letting strptime raise on every ISO timestamp.
+    if datetime_str[:1].isalpha():
+        if (parsed := _parse_twitter_datetime(datetime_str)) is not None:
+            return parsed
         try:
-            return dt.datetime.strptime(datetime_str, fmt)
-        except (ValueError, TypeError):
+            return dt.datetime.strptime(datetime_str, TWITTER_DATETIME_FORMAT)
+        except ValueError:
             pass
     try:
-        return dt.datetime.fromisoformat(str(datetime_str).replace('Z', '+00:00'))
-    except (ValueError, TypeError):
-        return dt.datetime.now(dt.timezone.utc)
+        return dt.datetime.fromisoformat(datetime_str.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+def parse_datetime(datetime_str: str) -> dt.datetime:
+    # Only successful parses are worth caching; unparseable timestamps fall back to the current time,
+    # which must be read on every call.
+    parsed = _parse_datetime_str(str(datetime_str))
+    return parsed if parsed is not None else dt.datetime.now(dt.timezone.utc)
+
+@functools.lru_cache(maxsize=4096)
+def data_label(value: str) -> DataLabel:
+    # DataLabel is frozen, so every entity from a run can share one validated instance of the run's label.
+    return DataLabel(value=value)
+
+# Malformed items are screened out with explicit checks. Only building the entity can still fail: encoding
+# lone surrogates and pydantic validation raise ValueError, and unhashable labels raise TypeError.
 
 def transform_twitter_item(item: dict, label: str) -> DataEntity | None:
+    content_str = item.get("full_text") or item.get("text")
+    url = item.get('url')
+    datetime_str = item.get('created_at')
+    if not (isinstance(content_str, str) and url and datetime_str): return None
     try:
-        content_str = item.get("full_text") or item.get("text")
-        url = item.get('url')
-        datetime_str = item.get('created_at')
-        if not all([content_str, url, datetime_str]): return None
         content = content_str.encode('utf-8')
-        return DataEntity(uri=url, datetime=parse_datetime(datetime_str), source=DataSource.X, label=DataLabel(value=label), content=content, content_size_bytes=len(content))
-    except Exception: return None
+        return DataEntity(uri=url, datetime=parse_datetime(datetime_str), source=DataSource.X, label=data_label(label), content=content, content_size_bytes=len(content))
+    except (ValueError, TypeError): return None
 
 def transform_reddit_item(item: dict, label: str) -> DataEntity | None:
+    url = item.get('url')
+    datetime_str = item.get('createdAt')
+    if not (url and datetime_str): return None
     try:
-        content_text = f"{item.get('title', '')}\n\n{item.get('body', '')}".strip()
-        url = item.get('url')
-        datetime_str = item.get('createdAt')
-        if not all([content_text, url, datetime_str]): return None
-        content = content_text.encode('utf-8')
-        return DataEntity(uri=url, datetime=parse_datetime(datetime_str), source=DataSource.REDDIT, label=DataLabel(value=label), content=content, content_size_bytes=len(content))
-    except Exception: return None
-
-def transform_youtube_item(item: dict, label: str) -> DataEntity | None:
+        # Join the encoded fields as bytes, rather than building the combined str and then encoding it.
+        # Link and image posts have no body, so only join when both fields are present.
+        title = str(item.get('title', '')).encode('utf-8')
+        body = str(item.get('body', '')).encode('utf-8')
+        content = (b"\n\n".join((title, body)) if title and body else title or body).strip()
+        if not content: return None
+        return DataEntity(uri=url, datetime=parse_datetime(datetime_str), source=DataSource.REDDIT, label=data_label(label), content=content, content_size_bytes=len(content))
+    except (ValueError, TypeError): return None
+
+def transform_youtube_item(item: dict, label: str, now: dt.datetime | None = None) -> DataEntity | None:
+    # Transcripts carry no timestamp, so they are dated with the ingestion time. Callers transforming a batch
+    # pass it in as now, so the clock is read once per batch rather than once per item.
+    transcript = item.get('text') or item.get('transcript')
+    url = item.get('url')
+    if not (isinstance(transcript, str) and url): return None
     try:
-        transcript = item.get('text') or item.get('transcript')
-        url = item.get('url')
-        if not all([transcript, url]): return None
         content = transcript.encode('utf-8')
         youtube_label = item.get('title') or label
-        return DataEntity(uri=url, datetime=dt.datetime.now(dt.timezone.utc), source=DataSource.YOUTUBE, label=DataLabel(value=youtube_label), content=content, content_size_bytes=len(content))
-    except Exception: return None
+        return DataEntity(uri=url, datetime=now or dt.datetime.now(dt.timezone.utc), source=DataSource.YOUTUBE, label=data_label(youtube_label), content=content, content_size_bytes=len(content))
+    except (ValueError, TypeError): return None
+
+def transform_batch(items: list, transformer: callable, label: str) -> tuple[list, dt.datetime | None]:
+    # Returns the valid entities along with the newest entity datetime, which is tracked while transforming
+    # rather than by scanning the entities again afterwards.
+    entities = []
+    latest_datetime = None
+    for item in items:
+        entity = transformer(item, label)
+        if entity is None:
+            continue
+        entities.append(entity)
+        if latest_datetime is None or entity.datetime > latest_datetime:
+            latest_datetime = entity.datetime
+    return entities, latest_datetime
 
-def run_etl_for_run(client: ApifyClient, storage: PostgresMinerStorage, run_id: str, transformer: callable, label: str) -> dt.datetime | None:
+def run_etl_for_run(client: ApifyClient, storage: PostgresMinerStorage, run_id: str, transformer: callable, label: str, dataset_id: str | None = None) -> tuple[dt.datetime | None, str | None]:
+    # Returns the newest entity datetime and the id of the dataset to clean up, both None if nothing was stored.
+    # The dataset is deleted by the caller, so the cleanups of every run can be issued together at the end.
     logging.info(f"Fetching dataset items for run_id: {run_id}")
-    dataset_items = client.run(run_id).dataset().list_items().items
-    if not dataset_items:
-        logging.warning(f"No items found for run_id: {run_id}.")
-        return None
+    # The caller usually already has the run's dataset id from when the run finished. Only look the run up
+    # when it does not, so its id can be returned for cleanup after it has been read.
+    run_client = client.run(run_id)
+    if not dataset_id:
+        run_info = run_client.get()
+        dataset_id = run_info.get('defaultDatasetId') if run_info else None
+    dataset_client = client.dataset(dataset_id) if dataset_id else run_client.dataset()
 
-    valid_entities = [entity for item in dataset_items if (entity := transformer(item, label)) is not None]
-    if not valid_entities:
-        logging.warning(f"No valid entities were transformed from run_id: {run_id}.")
-        return None
+    # Stream the dataset page by page and store it in batches, rather than holding every item in memory.
+    # Each batch is stored on a writer thread while the next one is fetched and transformed, so the network
+    # and the database are busy at the same time. At most one batch is being stored at any time.
+    dataset_items = dataset_client.iterate_items()
+    item_count = 0
+    stored_count = 0
+    latest_datetime = None
+    pending_store = None
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as writer:
+        while batch := list(itertools.islice(dataset_items, ETL_BATCH_SIZE)):
+            item_count += len(batch)
+            batch_transformer = transformer
+            if transformer is transform_youtube_item:
+                batch_transformer = functools.partial(transformer, now=dt.datetime.now(dt.timezone.utc))
+            valid_entities, batch_latest_datetime = transform_batch(batch, batch_transformer, label)
+            if not valid_entities:
+                continue
+            if latest_datetime is None or batch_latest_datetime > latest_datetime:
+                latest_datetime = batch_latest_datetime
+
+            if pending_store is not None:
+                pending_store.result()
+            logging.info(f"Storing {len(valid_entities)} DataEntities into the database...")
+            pending_store = writer.submit(storage.store_data_entities, valid_entities)
+            stored_count += len(valid_entities)
+
+        if pending_store is not None:
+            pending_store.result()
 
-    logging.info(f"Storing {len(valid_entities)} DataEntities into the database...")
-    storage.store_data_entities(valid_entities)
-    logging.info(f"Successfully stored {len(valid_entities)} entities from run_id: {run_id}")
+    if not item_count:
+        logging.warning(f"No items found for run_id: {run_id}.")
+        return None, None
+    if not stored_count:
+        logging.warning(f"No valid entities were transformed from run_id: {run_id}.")
+        return None, None
 
-    latest_datetime = max(entity.datetime for entity in valid_entities)
+    logging.info(f"Successfully stored {stored_count} entities from run_id: {run_id}")
     logging.info(f"Newest item in this batch has timestamp: {latest_datetime.isoformat()}")
 
-    run_info = client.run(run_id).get()
-    if run_info and 'defaultDatasetId' in run_info:
-        dataset_id = run_info['defaultDatasetId']
-        logging.info(f"Cleaning up Apify dataset {dataset_id} for run_id: {run_id}...")
-        client.dataset(dataset_id).delete()
-        logging.info(f"Successfully deleted Apify dataset {dataset_id}.")
-    
-    return latest_datetime
+    return latest_datetime, dataset_id
 
 def main(run_infos: list, storage: PostgresMinerStorage) -> dict:
     latest_timestamps = {}
@@ -96,14 +193,27 @@ def main(run_infos: list, storage: PostgresMinerStorage) -> dict:
     client = ApifyClient(APIFY_TOKEN)
     logging.info(f"--- Starting ETL Process for {len(run_infos)} successful runs ---")
     transformer_map = { DataSource.X: transform_twitter_item, DataSource.REDDIT: transform_reddit_item, DataSource.YOUTUBE: transform_youtube_item }
-    for run_info in run_infos:
-        transformer = transformer_map.get(run_info['source'])
-        if transformer:
-            newest_timestamp = run_etl_for_run(client=client, storage=storage, run_id=run_info['run_id'], transformer=transformer, label=run_info['label'])
+    etl_runs = [(run_info, transformer_map[run_info['source']]) for run_info in run_infos if run_info['source'] in transformer_map]
+    # Each run is independent and mostly waits on Apify and the database, so process several at once.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_ETL_RUNS) as executor:
+        results = executor.map(
+            lambda etl_run: run_etl_for_run(client=client, storage=storage, run_id=etl_run[0]['run_id'], transformer=etl_run[1], label=etl_run[0]['label'], dataset_id=etl_run[0].get('dataset_id')),
+            etl_runs,
+        )
+        dataset_ids = []
+        for (run_info, _), (newest_timestamp, dataset_id) in zip(etl_runs, results):
+            if dataset_id:
+                dataset_ids.append(dataset_id)
             if newest_timestamp:
                 label = run_info['label']
                 if label not in latest_timestamps or newest_timestamp > latest_timestamps[label]:
                     latest_timestamps[label] = newest_timestamp
+
+        # Clean up the stored runs' datasets together, rather than one round trip at a time.
+        if dataset_ids:
+            logging.info(f"Cleaning up {len(dataset_ids)} Apify datasets...")
+            list(executor.map(lambda dataset_id: client.dataset(dataset_id).delete(), dataset_ids))
+            logging.info(f"Successfully deleted Apify datasets: {dataset_ids}.")
     logging.info("--- ETL Process Finished ---")
     return latest_timestamps
 
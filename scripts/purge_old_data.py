@@ -17,10 +17,62 @@ logging.basicConfig(level=logging.INFO, format='🧹 PURGE: %(asctime)s - %(mess
 DATABASE_PATH = os.path.join(project_root, 'miner_data.db')
 # The retention period for data, in days. Data older than this will be deleted.
 RETENTION_DAYS = 30
+# The number of rows deleted per transaction, so the write lock is released between batches.
+PURGE_BATCH_SIZE = 10_000
+# The number of free pages returned to the filesystem per incremental vacuum step.
+VACUUM_BATCH_PAGES = 1000
+# SQLite's value for PRAGMA auto_vacuum=INCREMENTAL.
+AUTO_VACUUM_INCREMENTAL = 2
 
-def purge_old_data():
+def reclaim_free_pages(conn: sqlite3.Connection):
+    """
+    Returns the pages freed by deleted rows to the filesystem.
+
+    Databases that are already in incremental auto_vacuum mode are shrunk a batch of pages at a time.
+    Otherwise a single full VACUUM is run, which also switches the database to incremental mode
+    so that later purges can take the cheap path.
+    """
+    auto_vacuum = conn.execute("PRAGMA auto_vacuum;").fetchone()[0]
+    if auto_vacuum != AUTO_VACUUM_INCREMENTAL:
+        # Changing auto_vacuum on an existing database only takes effect after a full VACUUM.
+        logging.info("Running VACUUM to switch the database to incremental auto_vacuum...")
+        conn.execute(f"PRAGMA auto_vacuum={AUTO_VACUUM_INCREMENTAL};")
+        conn.execute("VACUUM;")
+        return
+
+    initial_free_pages = conn.execute("PRAGMA freelist_count;").fetchone()[0]
+    while conn.execute("PRAGMA freelist_count;").fetchone()[0] > 0:
+        # executescript steps the pragma to completion; execute would only free a single page.
+        conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_BATCH_PAGES});")
+    # Truncate the WAL so the freed pages are removed from the main database file.
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    logging.info(f"Incremental vacuum returned {initial_free_pages} pages to the filesystem.")
+
+def compact_database(db_path: str):
+    """
+    Writes a compacted copy of the database with VACUUM INTO and swaps it into place.
+
+    This only copies live rows, so it is cheaper than a VACUUM on a database that is mostly free pages.
+    The miner must be stopped first, because the original file is replaced.
+    """
+    compact_path = f"{db_path}.compact"
+    if os.path.exists(compact_path):
+        os.remove(compact_path)
+
+    logging.info(f"Writing compacted copy of {db_path} to {compact_path}...")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("VACUUM INTO ?;", (compact_path,))
+    conn.close()
+
+    os.replace(compact_path, db_path)
+    logging.info("Compacted database swapped into place.")
+
+def purge_old_data(compact: bool = False):
     """
     Connects to the SQLite database and deletes records older than the retention period.
+
+    Args:
+        compact (bool): Reclaim space with a VACUUM INTO copy instead of vacuuming in place.
     """
     logging.info(f"Starting purge process for database: {DATABASE_PATH}")
     logging.info(f"Data retention period is set to {RETENTION_DAYS} days.")
@@ -38,28 +90,45 @@ def purge_old_data():
         logging.info(f"Calculated cutoff date: {cutoff_date_str}. Deleting all records older than this.")
 
         with sqlite3.connect(DATABASE_PATH) as conn:
+            # WAL lets the miner keep reading and writing while old rows are deleted.
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
+            conn.execute("PRAGMA temp_store=MEMORY;")
             cursor = conn.cursor()
 
-            # First, count the number of records that will be deleted for logging purposes.
-            cursor.execute("SELECT COUNT(*) FROM data_entities WHERE datetime < ?", (cutoff_date_str,))
-            count_to_delete = cursor.fetchone()[0]
+            # Index the timestamp so the deletes below do not scan the whole table.
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_data_entities_datetime ON data_entities(datetime)")
+            conn.commit()
+
+            # Delete in bounded batches, committing each one. The deleted rows are counted from each batch's
+            # rowcount rather than with a separate COUNT(*) over the same range.
+            deleted_count = 0
+            while True:
+                cursor.execute(
+                    "DELETE FROM data_entities WHERE rowid IN "
+                    "(SELECT rowid FROM data_entities WHERE datetime < ? LIMIT ?)",
+                    (cutoff_date_str, PURGE_BATCH_SIZE),
+                )
+                conn.commit()
+                if cursor.rowcount <= 0:
+                    break
+                deleted_count += cursor.rowcount
 
-            if count_to_delete == 0:
+            if deleted_count == 0:
                 logging.info("No old records found to delete. Database is up to date.")
             else:
-                logging.info(f"Found {count_to_delete} records to delete...")
-                # Execute the DELETE statement.
-                cursor.execute("DELETE FROM data_entities WHERE datetime < ?", (cutoff_date_str,))
-                conn.commit()
                 # --- CORRECTED: Replaced logging.success with logging.info ---
-                logging.info(f"Successfully deleted {cursor.rowcount} old records from the database.")
-            
-            # Optional: Run VACUUM to reclaim disk space from the deleted rows.
-            # This can be slow on very large databases.
-            logging.info("Running VACUUM to optimize database file size...")
-            conn.execute("VACUUM;")
-            # --- CORRECTED: Replaced logging.success with logging.info ---
-            logging.info("Database optimization complete.")
+                logging.info(f"Successfully deleted {deleted_count} old records from the database.")
+
+            if not compact:
+                # Reclaim disk space from the deleted rows.
+                reclaim_free_pages(conn)
+                # --- CORRECTED: Replaced logging.success with logging.info ---
+                logging.info("Database optimization complete.")
+        conn.close()
+
+        if compact:
+            compact_database(DATABASE_PATH)
 
     except sqlite3.Error as e:
         logging.error(f"A database error occurred: {e}")
@@ -67,4 +136,4 @@ def purge_old_data():
         logging.error(f"An unexpected error occurred: {e}")
 
 if __name__ == "__main__":
-    purge_old_data()
+    purge_old_data(compact="--compact" in sys.argv[1:])
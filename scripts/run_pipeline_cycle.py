@@ -1,11 +1,12 @@
 import os
+import asyncio
 import sys
-import json
 import random
 import logging
 import traceback
 import datetime as dt
-from apify_client import ApifyClient
+import orjson
+from apify_client import ApifyClientAsync
 from dotenv import load_dotenv
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -27,6 +28,8 @@ X_SCRAPER_ACTOR_ID = "xtdata/twitter-x-scraper"
 REDDIT_SCRAPER_ACTOR_ID = "trudax/reddit-scraper-lite"
 YOUTUBE_DISCOVERY_ACTOR_ID = "streamers/youtube-scraper"
 YOUTUBE_TRANSCRIPT_ACTOR_ID = "smartly_automated/youtube-transcript-scraper-premium-version"
+# The maximum number of Apify actor runs in flight at once.
+MAX_CONCURRENT_ACTOR_RUNS = 8
 
 MONTHLY_BUDGET_USD = 135.0
 RUNS_PER_DAY = 24
@@ -51,34 +54,53 @@ def calculate_per_run_limits() -> dict:
 def load_pipeline_state() -> dict:
     if not os.path.exists(STATE_FILE_PATH): return {}
     try:
-        with open(STATE_FILE_PATH, 'r') as f:
-            state = json.load(f)
+        with open(STATE_FILE_PATH, 'rb') as f:
+            state = orjson.loads(f.read())
             return {label: dt.datetime.fromisoformat(ts) for label, ts in state.items()}
-    except (json.JSONDecodeError, IOError):
+    except (orjson.JSONDecodeError, IOError):
         return {}
 
 def save_pipeline_state(state: dict):
-    with open(STATE_FILE_PATH, 'w') as f:
-        json.dump({label: ts.isoformat() for label, ts in state.items()}, f, indent=4)
+    # orjson writes the datetimes as ISO 8601 strings itself, so no converted copy of the state is built.
+    with open(STATE_FILE_PATH, 'wb') as f:
+        f.write(orjson.dumps(state, option=orjson.OPT_INDENT_2))
     logger.info(f"Successfully saved pipeline state.")
 
-def trigger_and_wait(client: ApifyClient, actor_id: str, run_input: dict, label: str, source: DataSource) -> dict | None:
+async def trigger_and_wait(client: ApifyClientAsync, semaphore: asyncio.Semaphore, actor_id: str, run_input: dict, label: str, source: DataSource) -> dict | None:
     try:
-        logger.info(f"Triggering actor '{actor_id}' for label '{label}'")
-        run = client.actor(actor_id).call(run_input=run_input)
-        run_details = client.run(run['id']).wait_for_finish()
+        # Bound how many actor runs are in flight at once, since each one holds an Apify run slot.
+        async with semaphore:
+            logger.info(f"Triggering actor '{actor_id}' for label '{label}'")
+            run = await client.actor(actor_id).call(run_input=run_input)
+            run_details = await client.run(run['id']).wait_for_finish()
         if run_details['status'] == 'SUCCEEDED':
             logger.info(f"✅ Apify run {run['id']} completed successfully.")
-            return {'run_id': run['id'], 'source': source, 'label': label}
+            return {'run_id': run['id'], 'dataset_id': run_details.get('defaultDatasetId'), 'source': source, 'label': label}
         else:
+            logger.warning(f"Apify run {run['id']} of actor '{actor_id}' for label '{label}' finished with status {run_details['status']}.")
             return None
     except Exception:
+        logger.error(f"❌ Actor '{actor_id}' for label '{label}' failed: {traceback.format_exc()}")
         return None
 
-def main_cycle():
+async def discover_youtube_videos(client: ApifyClientAsync, semaphore: asyncio.Semaphore, run_input: dict, label: str) -> list:
+    run_info = await trigger_and_wait(client, semaphore, YOUTUBE_DISCOVERY_ACTOR_ID, run_input, label, DataSource.YOUTUBE)
+    if not run_info:
+        return []
+    video_urls = []
+    run_client = client.run(run_info['run_id'])
+    dataset = (await run_client.dataset().list_items()).items
+    for item in dataset:
+        if url := item.get('url') or item.get('videoUrl'):
+            video_urls.append({'url': url, 'title': item.get('title', label)})
+    await run_client.delete()
+    return video_urls
+
+async def main_cycle():
     logger.info("--- Starting New Data Pipeline Cycle ---")
     try:
         storage = PostgresMinerStorage()
+        storage.create_tables_if_not_exists()
         logger.info("✅ Pre-flight check complete. Database is ready.")
     except Exception:
         logger.error(f"❌ Pre-flight check failed. Could not initialize database: {traceback.format_exc()}")
@@ -88,53 +110,57 @@ def main_cycle():
         logger.error("APIFY_TOKEN is not set. Exiting.")
         return
 
-    client = ApifyClient(APIFY_TOKEN)
+    client = ApifyClientAsync(APIFY_TOKEN)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_ACTOR_RUNS)
     pipeline_state = load_pipeline_state()
     per_run_limits = calculate_per_run_limits()
 
     targets = get_scraping_targets()
     scraper_configs = targets.get('scraper_configs', {})
-    successful_run_infos = []
 
+    # The actor runs are independent, so trigger them all at once and wait for them together. The cycle then
+    # takes as long as the slowest run instead of the sum of all of them.
+    scraper_runs = []
     if 'X.flash' in scraper_configs:
         for config in scraper_configs['X.flash'].labels_to_scrape:
             if config.label_choices:
                 label = random.choice(config.label_choices)
                 run_input = {"searchTerms": [label], "maxItems": per_run_limits['x_per_run_limit'], "sort": "Latest"}
                 if label in pipeline_state: run_input["since"] = pipeline_state[label].strftime('%Y-%m-%d')
-                run_info = trigger_and_wait(client, X_SCRAPER_ACTOR_ID, run_input, label, DataSource.X)
-                if run_info: successful_run_infos.append(run_info)
+                scraper_runs.append(trigger_and_wait(client, semaphore, X_SCRAPER_ACTOR_ID, run_input, label, DataSource.X))
 
     if 'Reddit.lite' in scraper_configs:
         for config in scraper_configs['Reddit.lite'].labels_to_scrape:
             if config.label_choices:
                 label = random.choice(config.label_choices)
                 run_input = {"searches": [label], "maxItems": per_run_limits['reddit_per_run_limit'], "sortBy": "new"}
-                run_info = trigger_and_wait(client, REDDIT_SCRAPER_ACTOR_ID, run_input, label, DataSource.REDDIT)
-                if run_info: successful_run_infos.append(run_info)
+                scraper_runs.append(trigger_and_wait(client, semaphore, REDDIT_SCRAPER_ACTOR_ID, run_input, label, DataSource.REDDIT))
 
-    youtube_video_urls = []
+    youtube_discovery_runs = []
     if 'YouTube.custom.transcript' in scraper_configs:
         for config in scraper_configs['YouTube.custom.transcript'].labels_to_scrape:
             if config.label_choices:
                 label = random.choice(config.label_choices)
                 run_input = {"searchQueries": [label], "maxVideos": per_run_limits['youtube_per_run_limit']}
-                run_info = trigger_and_wait(client, YOUTUBE_DISCOVERY_ACTOR_ID, run_input, label, DataSource.YOUTUBE)
-                if run_info:
-                    dataset = client.run(run_info['run_id']).dataset().list_items().items
-                    for item in dataset:
-                        if url := item.get('url') or item.get('videoUrl'):
-                            youtube_video_urls.append({'url': url, 'title': item.get('title', label)})
-                    client.run(run_info['run_id']).delete()
+                youtube_discovery_runs.append(discover_youtube_videos(client, semaphore, run_input, label))
+
+    # A failed discovery run is logged and skipped, so it cannot discard the results of the runs alongside it.
+    results = await asyncio.gather(*scraper_runs, *youtube_discovery_runs, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"❌ A scraper run failed: {result!r}")
+    successful_run_infos = [run_info for run_info in results[:len(scraper_runs)] if isinstance(run_info, dict)]
+    youtube_video_urls = [video for videos in results[len(scraper_runs):] if isinstance(videos, list) for video in videos]
 
     if youtube_video_urls:
         run_input = {"video_urls": youtube_video_urls}
-        run_info = trigger_and_wait(client, YOUTUBE_TRANSCRIPT_ACTOR_ID, run_input, "transcript_batch", DataSource.YOUTUBE)
+        run_info = await trigger_and_wait(client, semaphore, YOUTUBE_TRANSCRIPT_ACTOR_ID, run_input, "transcript_batch", DataSource.YOUTUBE)
         if run_info: successful_run_infos.append(run_info)
 
     if successful_run_infos:
-        etl_infos = [{'run_id': info['run_id'], 'source': info['source'], 'label': info['label']} for info in successful_run_infos]
-        new_timestamps = run_etl(etl_infos, storage)
+        etl_infos = [{'run_id': info['run_id'], 'dataset_id': info['dataset_id'], 'source': info['source'], 'label': info['label']} for info in successful_run_infos]
+        # The ETL and its database writes are blocking, so keep them off the event loop.
+        new_timestamps = await asyncio.to_thread(run_etl, etl_infos, storage)
         pipeline_state.update(new_timestamps)
         save_pipeline_state(pipeline_state)
     else:
@@ -142,4 +168,4 @@ def main_cycle():
     logger.info("--- Data Pipeline Cycle Finished ---")
 
 if __name__ == "__main__":
-    main_cycle()
+    asyncio.run(main_cycle())
@@ -5,18 +5,17 @@ import os
 import sys
 from apify_client import ApifyClientAsync
 from dotenv import load_dotenv
-import importlib.util
 
-# ✅ FINAL FIX: Use importlib for a robust, explicit import.
-# This bypasses potential sys.path issues.
+# Import desirability_manager from the project root through the normal import system, so its cached
+# bytecode is reused instead of the source being re-read and re-compiled on every run.
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
 try:
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    module_path = os.path.join(project_root, "desirability_manager.py")
-    spec = importlib.util.spec_from_file_location("desirability_manager", module_path)
-    desirability_manager_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(desirability_manager_module)
-    DesirabilityManager = desirability_manager_module.DesirabilityManager
-except FileNotFoundError:
+    from desirability_manager import DesirabilityManager
+except ModuleNotFoundError as e:
+    # Let a missing dependency of desirability_manager surface as itself.
+    if e.name != "desirability_manager":
+        raise
     print("FATAL: desirability_manager.py not found in the parent directory.", file=sys.stderr)
     sys.exit(1)
 
@@ -38,9 +37,14 @@ SCRAPER_ACTOR_IDS = {
     "youtube_scraper_id": "streamers/youtube-scraper"
 }
 
-async def main():
+async def main(apify_client: ApifyClientAsync | None = None):
     """
     Main function to trigger the controller actor with dynamic targets.
+
+    Args:
+        apify_client (ApifyClientAsync | None): The client to trigger with. Defaults to a new client for this
+            call. The client's pooled connections are tied to the event loop they were opened on, so a caller
+            triggering repeatedly can only share one client between calls made on the same loop.
     """
     print("▶️ Starting the trigger script...")
     if not API_TOKEN:
@@ -49,10 +53,9 @@ async def main():
     print("✅ Apify Client Initialized.")
     
     # Initialize the desirability manager to get targets
-    desirability_manager = DesirabilityManager()
-    
-    print("🎯 Fetching dynamic targets for this run from the SN13 Dashboard...")
-    targets = await desirability_manager.get_desirable_targets()
+    async with DesirabilityManager() as desirability_manager:
+        print("🎯 Fetching dynamic targets for this run from the SN13 Dashboard...")
+        targets = await desirability_manager.get_desirable_targets()
     print(f"✅ Targets for this run: {targets}")
 
     # Combine the scraping targets with the scraper actor IDs
@@ -64,7 +67,7 @@ async def main():
     print(f"🚀 Triggering the '{CONTROLLER_ACTOR_ID}' with direct input...")
     
     try:
-        apify_client = ApifyClientAsync(API_TOKEN)
+        apify_client = apify_client or ApifyClientAsync(API_TOKEN)
         controller_actor = apify_client.actor(CONTROLLER_ACTOR_ID)
         
         # Start the actor and wait for it to finish
@@ -17,17 +17,24 @@ def verify_database_contents():
 
     try:
         with sqlite3.connect(DB_PATH) as conn:
+            # WAL lets this read run alongside a miner that is writing, and a larger page cache and
+            # memory-mapped I/O speed up the counting scan.
+            conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA mmap_size=268435456;
+                PRAGMA cache_size=-65536;
+            """)
             cursor = conn.cursor()
 
-            # 1. Count the total number of records
-            cursor.execute("SELECT COUNT(*) FROM data_entities")
-            total_rows = cursor.fetchone()[0]
+            # 1. Count records by source, deriving the total from the same scan
+            cursor.execute("SELECT source, COUNT(*) FROM data_entities GROUP BY source")
+            source_counts = cursor.fetchall()
+            total_rows = sum(count for _, count in source_counts)
             print(f"✅ Total records in data_entities table: {total_rows}\n")
 
-            # 2. Count records by source to provide a clear breakdown
+            # 2. Print the per-source breakdown
             print("Breakdown by source:")
-            cursor.execute("SELECT source, COUNT(*) FROM data_entities GROUP BY source")
-            source_counts = cursor.fetchall()
             for source, count in source_counts:
                 print(f"  - {source}: {count} records")
 
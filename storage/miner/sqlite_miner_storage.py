@@ -1,7 +1,14 @@
+import atexit
+import contextlib
+import io
 import os
 import logging
 import threading
+import uuid
 import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+import psycopg2.pool
 from collections import defaultdict
 from common import constants, utils
 from common.data import (
@@ -10,46 +17,108 @@ from common.data import (
     DataEntity,
     DataEntityBucket,
     DataEntityBucketId,
-    DataLabel,
     DataSource,
-    TimeBucket,
     HuggingFaceMetadata,
 )
 from storage.miner.miner_storage import MinerStorage
-from typing import Dict, List
+from typing import Dict, Iterator, List
 import datetime as dt
 
 # Configure logging for this module
 logger = logging.getLogger(__name__)
 
+# How old the cached compressed index can get before a GetMinerIndex request triggers a refresh. The miner's
+# refresh thread is expected to keep it fresher than this, so requests normally never trigger one.
+COMPRESSED_INDEX_STALE_AFTER = constants.MINER_CACHE_FRESHNESS + dt.timedelta(minutes=10)
+
+# The number of rows sent in each multi-row INSERT when storing data entities.
+STORE_PAGE_SIZE = 1000
+# Batches at least this large are bulk loaded with COPY, smaller ones use a plain multi-row INSERT.
+COPY_MIN_ROWS = 100
+# The placeholders for one data_entities row, in the column order of _data_entity_rows. Kept as bytes, since
+# execute_values mogrifies it once per row and a str template would be re-encoded every time.
+DATA_ENTITY_ROW_TEMPLATE = b"(%s,%s,%s,%s,%s,%s,%s)"
+# Lets a store transaction commit without waiting for its WAL to be flushed. A crash can lose the last few
+# commits, which is acceptable here because the scrapes that produced them can be re-run.
+RELAXED_COMMIT_SQL = "SET LOCAL synchronous_commit = OFF"
+# pg_attribute.attcompression for a column compressed with lz4.
+LZ4_ATTCOMPRESSION = "l"
+# The number of rows fetched from the server per round trip when listing a bucket.
+BUCKET_SCAN_ITERSIZE = 1000
+# The number of aggregated buckets fetched from the server per round trip when building the compressed index.
+COMPRESSED_INDEX_ITERSIZE = 10_000
+# The most connections kept open to the database at once, overridable with PG_POOL_MAX.
+MAX_POOL_CONNECTIONS = int(os.environ.get("PG_POOL_MAX", 10))
+
+# The characters that must be backslash escaped in a COPY text format field.
+_COPY_TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text_field(value: str) -> str:
+    """Escapes a value for a COPY text format field, skipping the translation for the common clean value."""
+    if "\\" in value or "\t" in value or "\n" in value or "\r" in value:
+        return value.translate(_COPY_TEXT_ESCAPES)
+    return value
+
+
 class PostgresMinerStorage(MinerStorage):
     """PostgreSQL backed MinerStorage."""
 
     def __init__(self):
         """Initializes the PostgreSQL miner storage."""
-        # --- IMPORTANT: Replace with your actual database credentials ---
-        self.dbname = "miner_db"
-        self.user = "miner_user"
-        self.password = "sn0wyhuh"
-        self.host = "localhost"
-        self.port = "5432"
-        # --- End of credentials ---
-
-        self.create_tables_if_not_exists()
+        # Connection settings are read from the environment, falling back to the local miner database's defaults.
+        # The password has no default. Without PG_PASSWORD, libpq looks for one in PGPASSWORD or ~/.pgpass.
+        self.dbname = os.environ.get("PG_DB", "miner_db")
+        self.user = os.environ.get("PG_USER", "miner_user")
+        self.password = os.environ.get("PG_PASSWORD")
+        self.host = os.environ.get("PG_HOST", "localhost")
+        self.port = os.environ.get("PG_PORT", "5432")
+
+        # Connections are reused across calls rather than opened for every query. The semaphore makes callers
+        # wait for a free connection, where the pool itself would raise once all of them are checked out.
+        # make_dsn quotes each value and leaves out the password when it is unset.
+        conn_string = psycopg2.extensions.make_dsn(
+            dbname=self.dbname, user=self.user, password=self.password, host=self.host, port=self.port
+        )
+        self._connection_pool = psycopg2.pool.ThreadedConnectionPool(0, MAX_POOL_CONNECTIONS, conn_string)
+        self._connection_slots = threading.BoundedSemaphore(MAX_POOL_CONNECTIONS)
+        # Close the pooled connections cleanly at exit instead of leaving the server to notice dropped sockets.
+        atexit.register(self._connection_pool.closeall)
+
+        # The schema is created on first use rather than here, so constructing the storage does not require
+        # the database to be reachable.
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
         self.clearing_space_lock = threading.Lock()
         self.cached_index_refresh_lock = threading.Lock()
         self.cached_index_lock = threading.Lock()
-        self.cached_index_4 = None
-        self.cached_index_updated = dt.datetime.min
+        # Compressed indexes and the times they were computed, keyed by the bucket count limit they were built with.
+        self.cached_indexes: Dict[int, CompressedMinerIndex] = {}
+        self.cached_indexes_updated: Dict[int, dt.datetime] = {}
 
+    @contextlib.contextmanager
     def _create_connection(self):
-        """Creates a new PostgreSQL connection."""
-        try:
-            conn_string = f"dbname='{self.dbname}' user='{self.user}' password='{self.password}' host='{self.host}' port='{self.port}'"
-            return psycopg2.connect(conn_string)
-        except psycopg2.OperationalError as e:
-            logger.error(f"FATAL: Could not connect to PostgreSQL database. Please check credentials and server status. Error: {e}")
-            raise
+        """Checks out a pooled PostgreSQL connection, committing on success and rolling back on error."""
+        with self._connection_slots:
+            try:
+                conn = self._connection_pool.getconn()
+            except psycopg2.OperationalError as e:
+                logger.error(f"FATAL: Could not connect to PostgreSQL database. Please check credentials and server status. Error: {e}")
+                raise
+            try:
+                with conn:
+                    yield conn
+            finally:
+                # Connections that were closed, e.g. by a server restart, are discarded rather than reused.
+                self._connection_pool.putconn(conn, close=bool(conn.closed))
+
+    def _ensure_schema(self):
+        """Creates the tables on the first call, if create_tables_if_not_exists has not already been called."""
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                self.create_tables_if_not_exists()
 
     def create_tables_if_not_exists(self):
         """Creates the necessary tables in the PostgreSQL database if they don't already exist."""
@@ -66,22 +135,49 @@ class PostgresMinerStorage(MinerStorage):
                     content_size_bytes BIGINT NOT NULL
                 );
                 """)
-                cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_data_entities_bucket
-                ON data_entities (time_bucket_id, source, label);
-                """)
+                # The bucket index carries content_size_bytes, so the compressed index aggregation can run as an
+                # index-only scan instead of reading every row's heap tuple. It keeps the same key columns, so it
+                # also serves bucket listings and replaces the plain bucket index. INCLUDE needs PostgreSQL 11+.
+                if conn.server_version >= 110000:
+                    cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_data_entities_bucket_sizes
+                    ON data_entities (time_bucket_id, source, label) INCLUDE (content_size_bytes);
+                    """)
+                    cursor.execute("DROP INDEX IF EXISTS idx_data_entities_bucket;")
+                else:
+                    cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_data_entities_bucket
+                    ON data_entities (time_bucket_id, source, label);
+                    """)
+                # LZ4 compresses the TOASTed content faster than the default pglz, which cuts the CPU and WAL
+                # cost of every large insert. It needs PostgreSQL 14+ built with lz4, so skip it otherwise.
+                if conn.server_version >= 140000:
+                    cursor.execute("""
+                    SELECT attcompression FROM pg_attribute
+                    WHERE attrelid = 'data_entities'::regclass AND attname = 'content';
+                    """)
+                    if cursor.fetchone()[0] != LZ4_ATTCOMPRESSION:
+                        cursor.execute("SAVEPOINT content_compression")
+                        try:
+                            cursor.execute("ALTER TABLE data_entities ALTER COLUMN content SET COMPRESSION lz4")
+                        except psycopg2.Error as e:
+                            cursor.execute("ROLLBACK TO SAVEPOINT content_compression")
+                            logger.info(f"Keeping the default compression for data_entities content: {e}")
                 conn.commit()
+        self._schema_ready = True
 
-    def store_data_entities(self, data_entities: List[DataEntity]):
-        """Stores a list of DataEntity objects in the PostgreSQL database."""
-        if not data_entities:
-            return
+    @staticmethod
+    def _data_entity_rows(data_entities: List[DataEntity]) -> List[tuple]:
+        """Returns the data_entities rows to upsert for the provided DataEntities.
 
-        values_to_insert = []
+        Rows are deduplicated by uri, keeping the last entity for each uri. A single INSERT ... ON CONFLICT
+        DO UPDATE cannot touch the same row twice, and the last write is what separate inserts would have kept.
+        """
+        rows = {}
         for data_entity in data_entities:
             label = data_entity.label.value if data_entity.label else None
-            time_bucket_id = TimeBucket.from_datetime(data_entity.datetime).id
-            values_to_insert.append((
+            time_bucket_id = utils.time_bucket_id_from_datetime(data_entity.datetime)
+            rows[data_entity.uri] = (
                 data_entity.uri,
                 data_entity.datetime,
                 time_bucket_id,
@@ -89,52 +185,254 @@ class PostgresMinerStorage(MinerStorage):
                 label,
                 data_entity.content,
                 data_entity.content_size_bytes
-            ))
+            )
+        return list(rows.values())
+
+    def store_data_entities(self, data_entities: List[DataEntity]):
+        """Stores a list of DataEntity objects in the PostgreSQL database.
+
+        Batches of at least COPY_MIN_ROWS entities are bulk loaded with store_data_entities_copy.
+        """
+        if not data_entities:
+            return
+        self._ensure_schema()
+        if len(data_entities) >= COPY_MIN_ROWS:
+            self.store_data_entities_copy(data_entities)
+            return
+
+        values_to_insert = PostgresMinerStorage._data_entity_rows(data_entities)
 
         with self._create_connection() as conn:
             with conn.cursor() as cursor:
+                cursor.execute(RELAXED_COMMIT_SQL)
                 sql = """
                 INSERT INTO data_entities (uri, datetime, time_bucket_id, source, label, content, content_size_bytes)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                VALUES %s
                 ON CONFLICT (uri) DO UPDATE SET
                     datetime = EXCLUDED.datetime,
                     content = EXCLUDED.content,
                     content_size_bytes = EXCLUDED.content_size_bytes;
                 """
-                cursor.executemany(sql, values_to_insert)
+                # Send the rows as multi-row INSERTs rather than one statement per row.
+                psycopg2.extras.execute_values(
+                    cursor,
+                    sql,
+                    values_to_insert,
+                    template=DATA_ENTITY_ROW_TEMPLATE,
+                    page_size=STORE_PAGE_SIZE,
+                )
+            conn.commit()
+
+    def store_data_entities_copy(self, data_entities: List[DataEntity]):
+        """Stores a list of DataEntity objects in the PostgreSQL database using COPY.
+
+        Faster than a multi-row INSERT for large batches. COPY cannot upsert, so the rows are copied into a
+        temporary staging table and then upserted into data_entities with a single INSERT ... SELECT.
+        """
+        if not data_entities:
+            return
+        self._ensure_schema()
+
+        # Build the COPY text format directly rather than through csv.writer, which scans every character of
+        # the hex encoded content for quoting. Only the free-form uri and label fields can need escaping.
+        lines = []
+        for uri, datetime, time_bucket_id, source, label, content, content_size_bytes in (
+            PostgresMinerStorage._data_entity_rows(data_entities)
+        ):
+            # \N is read as NULL, and bytea is sent in its hex input format with the backslash escaped.
+            label = _copy_text_field(label) if label is not None else "\\N"
+            lines.append(
+                f"{_copy_text_field(uri)}\t{datetime.isoformat()}\t{time_bucket_id}\t{int(source)}\t{label}\t"
+                f"\\\\x{content.hex()}\t{content_size_bytes}\n"
+            )
+        buffer = io.StringIO("".join(lines))
+
+        with self._create_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(RELAXED_COMMIT_SQL)
+                # Temporary tables are never WAL logged, so staging the COPY costs no WAL of its own.
+                cursor.execute(
+                    "CREATE TEMP TABLE data_entities_staging (LIKE data_entities) ON COMMIT DROP"
+                )
+                cursor.copy_expert(
+                    """COPY data_entities_staging (uri, datetime, time_bucket_id, source, label, content, content_size_bytes)
+                    FROM STDIN""",
+                    buffer,
+                )
+                cursor.execute("""
+                INSERT INTO data_entities (uri, datetime, time_bucket_id, source, label, content, content_size_bytes)
+                SELECT uri, datetime, time_bucket_id, source, label, content, content_size_bytes
+                FROM data_entities_staging
+                ON CONFLICT (uri) DO UPDATE SET
+                    datetime = EXCLUDED.datetime,
+                    content = EXCLUDED.content,
+                    content_size_bytes = EXCLUDED.content_size_bytes;
+                """)
             conn.commit()
 
     def list_data_entities_in_data_entity_bucket(self, data_entity_bucket_id: DataEntityBucketId) -> List[DataEntity]:
         """Lists from storage all DataEntities matching the provided DataEntityBucketId."""
-        data_entities = []
-        label = data_entity_bucket_id.label.value if data_entity_bucket_id.label else None
-        
+        return list(self.iter_data_entities_in_data_entity_bucket(data_entity_bucket_id))
+
+    def iter_data_entities_in_data_entity_bucket(self, data_entity_bucket_id: DataEntityBucketId) -> Iterator[DataEntity]:
+        """Yields from storage all DataEntities matching the provided DataEntityBucketId as they are read.
+
+        The pooled connection is held until the iterator is exhausted or closed, so callers that stop early
+        should close it rather than leave it for garbage collection.
+        """
+        self._ensure_schema()
+        # Every row in the bucket shares its source and label, so those are taken from the bucket id rather
+        # than selected and rebuilt for each row.
+        source = data_entity_bucket_id.source
+        data_label = data_entity_bucket_id.label
+        if data_label:
+            label_clause, params = "label = %s", (data_entity_bucket_id.time_bucket.id, source.value, data_label.value)
+        else:
+            # "label = NULL" never matches, so unlabeled buckets need IS NULL. IS NOT DISTINCT FROM would match
+            # both, but cannot use the bucket index.
+            label_clause, params = "label IS NULL", (data_entity_bucket_id.time_bucket.id, source.value)
+
         with self._create_connection() as conn:
-            with conn.cursor() as cursor:
+            # A named cursor streams the rows from the server in chunks, rather than fetching every content
+            # blob in the bucket into memory at once.
+            with conn.cursor(name=f"bucket_scan_{uuid.uuid4().hex}") as cursor:
+                cursor.itersize = BUCKET_SCAN_ITERSIZE
                 cursor.execute(
-                    "SELECT * FROM data_entities WHERE time_bucket_id = %s AND source = %s AND label = %s",
-                    (data_entity_bucket_id.time_bucket.id, data_entity_bucket_id.source.value, label)
+                    f"SELECT uri, datetime, content, content_size_bytes FROM data_entities WHERE time_bucket_id = %s AND source = %s AND {label_clause}",
+                    params,
                 )
-                for row in cursor.fetchall():
-                    # Assuming row is a tuple: (uri, datetime, time_bucket_id, source, label, content, content_size_bytes)
-                    data_entities.append(DataEntity(
-                        uri=row[0], datetime=row[1], source=DataSource(row[3]),
-                        label=DataLabel(value=row[4]) if row[4] else None,
-                        content=row[5], content_size_bytes=row[6]
-                    ))
-        return data_entities
-
-    def refresh_compressed_index(self, time_delta: dt.timedelta):
-        """Refreshes the compressed MinerIndex."""
-        # This is a complex method that interacts with the miner's core logic.
-        # For the pipeline to function, a placeholder is sufficient for now.
-        logger.info("refresh_compressed_index is a placeholder and has not been implemented for PostgreSQL yet.")
-        pass
+                for uri, datetime, content, content_size_bytes in cursor:
+                    yield DataEntity(
+                        uri=uri, datetime=datetime, source=source, label=data_label,
+                        content=bytes(content), content_size_bytes=content_size_bytes
+                    )
+
+    def _compute_compressed_index(
+        self,
+        bucket_count_limit: int = constants.DATA_ENTITY_BUCKET_COUNT_LIMIT_PER_MINER_INDEX_PROTOCOL_4,
+    ) -> CompressedMinerIndex:
+        """Builds the compressed MinerIndex from the sizes of the buckets currently in storage.
+
+        Only the bucket_count_limit largest buckets are included.
+        """
+        self._ensure_schema()
+        oldest_time_bucket_id = utils.time_bucket_id_from_datetime(
+            dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=constants.DATA_ENTITY_BUCKET_AGE_LIMIT_DAYS)
+        )
+        # Aggregate every bucket in a single GROUP BY, keeping the largest buckets when over the limit and
+        # capping each size in the database. The rows are streamed through a named cursor and grouped as they
+        # arrive, rather than fetching up to the bucket limit of rows into memory first.
+        buckets_by_source_by_label = defaultdict(dict)
+        with self._create_connection() as conn:
+            with conn.cursor(name=f"compressed_index_{uuid.uuid4().hex}") as cursor:
+                cursor.itersize = COMPRESSED_INDEX_ITERSIZE
+                cursor.execute(
+                    """
+                    SELECT time_bucket_id, source, label, LEAST(SUM(content_size_bytes), %s) AS capped_size
+                    FROM data_entities
+                    WHERE time_bucket_id >= %s
+                    GROUP BY time_bucket_id, source, label
+                    ORDER BY SUM(content_size_bytes) DESC
+                    LIMIT %s
+                    """,
+                    (
+                        constants.DATA_ENTITY_BUCKET_SIZE_LIMIT_BYTES,
+                        oldest_time_bucket_id,
+                        bucket_count_limit,
+                    ),
+                )
+                for time_bucket_id, source, label, capped_size in cursor:
+                    buckets_by_label = buckets_by_source_by_label[source]
+                    bucket = buckets_by_label.get(label)
+                    if bucket is None:
+                        bucket = buckets_by_label[label] = CompressedEntityBucket(label=label)
+                    bucket.time_bucket_ids.append(time_bucket_id)
+                    bucket.sizes_bytes.append(int(capped_size))
+
+        return CompressedMinerIndex(
+            sources={
+                DataSource(source): list(buckets_by_label.values())
+                for source, buckets_by_label in buckets_by_source_by_label.items()
+            }
+        )
+
+    @property
+    def cached_index_4(self) -> CompressedMinerIndex | None:
+        """The cached compressed MinerIndex for the protocol 4 bucket count limit, if one has been computed."""
+        with self.cached_index_lock:
+            return self.cached_indexes.get(constants.DATA_ENTITY_BUCKET_COUNT_LIMIT_PER_MINER_INDEX_PROTOCOL_4)
+
+    def _cached_index_age(self, bucket_count_limit: int) -> dt.timedelta:
+        """Returns how long ago the cached index for bucket_count_limit was computed.
+
+        Requires: cached_index_lock is held.
+        """
+        return dt.datetime.now() - self.cached_indexes_updated.get(bucket_count_limit, dt.datetime.min)
+
+    def _recompute_compressed_index(self, bucket_count_limit: int):
+        """Computes a new compressed MinerIndex and swaps it in as the cached index for bucket_count_limit.
+
+        The caller must hold cached_index_refresh_lock, so only one index is computed at a time.
+        """
+        compressed_index = self._compute_compressed_index(bucket_count_limit)
+        with self.cached_index_lock:
+            self.cached_indexes[bucket_count_limit] = compressed_index
+            self.cached_indexes_updated[bucket_count_limit] = dt.datetime.now()
+
+    def _recompute_compressed_index_in_background(self, bucket_count_limit: int):
+        """Recomputes the cached index, releasing cached_index_refresh_lock once done."""
+        try:
+            self._recompute_compressed_index(bucket_count_limit)
+        except Exception:
+            logger.exception("Failed to refresh the compressed index in the background.")
+        finally:
+            self.cached_index_refresh_lock.release()
+
+    def refresh_compressed_index(
+        self,
+        time_delta: dt.timedelta,
+        bucket_count_limit: int = constants.DATA_ENTITY_BUCKET_COUNT_LIMIT_PER_MINER_INDEX_PROTOCOL_4,
+    ):
+        """Refreshes the compressed MinerIndex for bucket_count_limit if the cached one is older than time_delta."""
+        with self.cached_index_lock:
+            if self._cached_index_age(bucket_count_limit) <= time_delta:
+                return
+
+        # Check again under the refresh lock, since another thread may have refreshed while we waited for it.
+        with self.cached_index_refresh_lock:
+            with self.cached_index_lock:
+                if self._cached_index_age(bucket_count_limit) <= time_delta:
+                    return
+            logger.info(f"Cached index out of {time_delta} freshness period. Refreshing cached index.")
+            self._recompute_compressed_index(bucket_count_limit)
 
     def list_contents_in_data_entity_buckets(self, data_entity_bucket_ids: List[DataEntityBucketId]) -> Dict[DataEntityBucketId, List[bytes]]:
         logger.warning("list_contents_in_data_entity_buckets is not yet implemented for PostgreSQL.")
         return defaultdict(list)
         
-    def get_compressed_index(self, bucket_count_limit=None) -> CompressedMinerIndex:
-        logger.warning("get_compressed_index is not yet implemented for PostgreSQL.")
-        return CompressedMinerIndex(sources={})
+    def get_compressed_index(
+        self,
+        bucket_count_limit: int = constants.DATA_ENTITY_BUCKET_COUNT_LIMIT_PER_MINER_INDEX_PROTOCOL_4,
+    ) -> CompressedMinerIndex:
+        """Gets the cached compressed MinerIndex of at most bucket_count_limit buckets.
+
+        Each limit is cached separately. A stale index is still returned immediately, while a single background
+        thread refreshes it. Only the first call for a limit, before its index has been computed, waits for one.
+        """
+        with self.cached_index_lock:
+            cached_index = self.cached_indexes.get(bucket_count_limit)
+            is_stale = self._cached_index_age(bucket_count_limit) > COMPRESSED_INDEX_STALE_AFTER
+
+        if cached_index is None:
+            self.refresh_compressed_index(
+                time_delta=COMPRESSED_INDEX_STALE_AFTER, bucket_count_limit=bucket_count_limit
+            )
+            with self.cached_index_lock:
+                return self.cached_indexes[bucket_count_limit]
+
+        # The refresh lock is held for the whole refresh, so a failed acquire means one is already running.
+        if is_stale and self.cached_index_refresh_lock.acquire(blocking=False):
+            threading.Thread(
+                target=self._recompute_compressed_index_in_background, args=(bucket_count_limit,), daemon=True
+            ).start()
+        return cached_index
@@ -1,6 +1,7 @@
 import contextlib
 import datetime as dt
 import bittensor as bt
+import queue
 import sqlite3
 import threading
 from typing import Any, Dict, Optional, Set, Tuple, List
@@ -117,13 +118,18 @@ class SqliteMemoryValidatorStorage(ValidatorStorage):
                                         )"""
 
 
+    # The maximum number of idle connections kept for reuse.
+    CONNECTION_POOL_SIZE = 16
+
     def __init__(self):
         sqlite3.register_converter("timestamp", tz_aware_timestamp_adapter)
 
         self.continuous_connection_do_not_reuse = self._create_connection()
         self.label_dict = AutoIncrementDict()
+        # Idle connections to the shared in-memory database, reused across calls and threads.
+        self._connection_pool = queue.SimpleQueue()
 
-        with contextlib.closing(self._create_connection()) as connection:
+        with self._pooled_connection() as connection:
             cursor = connection.cursor()
 
             # Create the Miner table (if it does not already exist).
@@ -149,17 +155,43 @@ class SqliteMemoryValidatorStorage(ValidatorStorage):
             uri=True,
             detect_types=sqlite3.PARSE_DECLTYPES,
             timeout=120.0,
+            # Pooled connections are handed to whichever thread needs one next.
+            check_same_thread=False,
         )
         # Avoid using a row_factory that would allow parsing results by column name for performance.
         # connection.row_factory = sqlite3.Row
         connection.isolation_level = None
         return connection
 
+    @contextlib.contextmanager
+    def _pooled_connection(self):
+        """Yields an idle connection from the pool, or a new one if none are idle.
+
+        The connection is returned to the pool afterwards, or closed if the pool is full.
+        """
+        try:
+            connection = self._connection_pool.get_nowait()
+        except queue.Empty:
+            connection = self._create_connection()
+
+        try:
+            yield connection
+        finally:
+            if (
+                connection.in_transaction
+                or self._connection_pool.qsize()
+                >= SqliteMemoryValidatorStorage.CONNECTION_POOL_SIZE
+            ):
+                # Don't reuse a connection that was left mid transaction.
+                connection.close()
+            else:
+                self._connection_pool.put(connection)
+
     def _upsert_miner(self, hotkey: str, now_str: str, credibility: float) -> int:
         miner_id = 0
 
         with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
+            with self._pooled_connection() as connection:
                 cursor = connection.cursor()
 
                 cursor.execute(
@@ -227,7 +259,7 @@ class SqliteMemoryValidatorStorage(ValidatorStorage):
             # Clear the previous keys for this miner.
             self._delete_miner_index(hotkey)
 
-            with contextlib.closing(self._create_connection()) as connection:
+            with self._pooled_connection() as connection:
                 cursor = connection.cursor()
                 # Insert the new keys. (Ignore into to defend against a miner giving us multiple duplicate rows.)
                 # Batch in groups of 1m if necessary to avoid congestion issues.
@@ -247,7 +279,7 @@ class SqliteMemoryValidatorStorage(ValidatorStorage):
     ) -> Optional[ScorableMinerIndex]:
         """Gets a scored index for all of the data that a specific miner promises to provide."""
         with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
+            with self._pooled_connection() as connection:
                 cursor = connection.cursor()
 
                 # locate miner
@@ -320,7 +352,7 @@ class SqliteMemoryValidatorStorage(ValidatorStorage):
 
         bt.logging.trace(f"{miner_hotkey}: Deleting miner index")
 
-        with contextlib.closing(self._create_connection()) as connection:
+        with self._pooled_connection() as connection:
             cursor = connection.cursor()
 
             cursor.execute("SELECT minerId FROM Miner WHERE hotkey = ?", [miner_hotkey])
@@ -336,14 +368,14 @@ class SqliteMemoryValidatorStorage(ValidatorStorage):
         with self.lock:
             self._delete_miner_index(hotkey)
             self._delete_hf_metadata(hotkey)
-            with contextlib.closing(self._create_connection()) as connection:
+            with self._pooled_connection() as connection:
                 cursor = connection.cursor()
                 cursor.execute("DELETE FROM Miner WHERE hotkey = ?", [hotkey])
 
     def read_miner_last_updated(self, miner_hotkey: str) -> Optional[dt.datetime]:
         """Gets when a specific miner was last updated."""
         with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
+            with self._pooled_connection() as connection:
                 cursor = connection.cursor()
                 cursor.execute(
                     "SELECT lastUpdated FROM Miner WHERE hotkey = ?", [miner_hotkey]
@@ -354,13 +386,34 @@ class SqliteMemoryValidatorStorage(ValidatorStorage):
                 else:
                     return None
 
+    def read_miners_last_updated(
+        self, miner_hotkeys: List[str]
+    ) -> Dict[str, Optional[dt.datetime]]:
+        """Gets when each of the specified miners was last updated, in a single query."""
+        last_updated = {hotkey: None for hotkey in miner_hotkeys}
+        if not miner_hotkeys:
+            return last_updated
+
+        with self.lock:
+            with self._pooled_connection() as connection:
+                cursor = connection.cursor()
+                placeholders = ",".join("?" * len(miner_hotkeys))
+                cursor.execute(
+                    f"SELECT hotkey, lastUpdated FROM Miner WHERE hotkey IN ({placeholders})",
+                    list(miner_hotkeys),
+                )
+                for hotkey, updated in cursor:
+                    last_updated[hotkey] = updated
+
+        return last_updated
+
     # Hugging face functionality
     def upsert_hf_metadata(self, hotkey: str, metadata: List[HuggingFaceMetadata]):
         """Stores or updates the HuggingFace metadata for a specific miner."""
         bt.logging.trace(f"{hotkey}: Upserting HuggingFace metadata with {len(metadata)} entries")
 
         with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
+            with self._pooled_connection() as connection:
                 cursor = connection.cursor()
                 cursor.execute("SELECT minerId FROM Miner WHERE hotkey = ?", [hotkey])
                 result = cursor.fetchone()
@@ -380,7 +433,7 @@ class SqliteMemoryValidatorStorage(ValidatorStorage):
     def read_hf_metadata(self, miner_hotkey: str) -> List[HuggingFaceMetadata]:
         """Gets the HuggingFace metadata for a specific miner."""
         with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
+            with self._pooled_connection() as connection:
                 cursor = connection.cursor()
                 cursor.execute("SELECT minerId FROM Miner WHERE hotkey = ?", [miner_hotkey])
                 result = cursor.fetchone()
@@ -403,7 +456,7 @@ class SqliteMemoryValidatorStorage(ValidatorStorage):
         """Removes the HuggingFace metadata for the specified miner."""
         bt.logging.trace(f"{miner_hotkey}: Deleting HuggingFace metadata")
 
-        with contextlib.closing(self._create_connection()) as connection:
+        with self._pooled_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("SELECT minerId FROM Miner WHERE hotkey = ?", [miner_hotkey])
             result = cursor.fetchone()
@@ -414,7 +467,7 @@ class SqliteMemoryValidatorStorage(ValidatorStorage):
     def has_hf_metadata(self, miner_hotkey: str) -> bool:
         """Checks if a specific miner has any HuggingFace metadata."""
         with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
+            with self._pooled_connection() as connection:
                 cursor = connection.cursor()
                 cursor.execute("SELECT minerId FROM Miner WHERE hotkey = ?", [miner_hotkey])
                 result = cursor.fetchone()
@@ -428,7 +481,7 @@ class SqliteMemoryValidatorStorage(ValidatorStorage):
     def read_hf_metadata_last_updated(self, miner_hotkey: str) -> Optional[dt.datetime]:
         """Gets when a specific miner's HuggingFace metadata was last updated."""
         with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
+            with self._pooled_connection() as connection:
                 cursor = connection.cursor()
                 cursor.execute("SELECT minerId FROM Miner WHERE hotkey = ?", [miner_hotkey])
                 result = cursor.fetchone()
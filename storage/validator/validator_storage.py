@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from common.data import CompressedMinerIndex
-from typing import Optional
+from typing import Dict, List, Optional
 import datetime as dt
 
 from common.data_v2 import ScorableMinerIndex
@@ -30,3 +30,10 @@ class ValidatorStorage(ABC):
     def read_miner_last_updated(self, miner_hotkey: str) -> Optional[dt.datetime]:
         """Gets when a specific miner was last updated."""
         raise NotImplemented
+
+    @abstractmethod
+    def read_miners_last_updated(
+        self, miner_hotkeys: List[str]
+    ) -> Dict[str, Optional[dt.datetime]]:
+        """Gets when each of the specified miners was last updated, in a single query."""
+        raise NotImplemented
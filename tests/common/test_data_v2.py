@@ -1,6 +1,11 @@
+import datetime as dt
 import unittest
 from common.data import DataEntityBucketId, DataLabel, DataSource, TimeBucket
-from common.data_v2 import ScorableDataEntityBucket, DataEntityBucket
+from common.data_v2 import (
+    ScorableDataEntityBucket,
+    ScorableMinerIndex,
+    DataEntityBucket,
+)
 
 
 class TestDataV2(unittest.TestCase):
@@ -86,6 +91,26 @@ class TestDataV2(unittest.TestCase):
         # Verify that the two instances are equal
         self.assertEqual(scorable_data_entity_bucket_1, scorable_data_entity_bucket_2)
 
+    def test_scorable_miner_index_cumulative_scorable_bytes(self):
+        buckets = [
+            ScorableDataEntityBucket(
+                time_bucket_id=i,
+                source=DataSource.REDDIT.value,
+                label=None,
+                size_bytes=200,
+                scorable_bytes=scorable_bytes,
+            )
+            for i, scorable_bytes in enumerate([100, 0, 50])
+        ]
+        index = ScorableMinerIndex(
+            scorable_data_entity_buckets=buckets,
+            last_updated=dt.datetime.now(tz=dt.timezone.utc),
+        )
+
+        self.assertEqual(index.cumulative_scorable_bytes.tolist(), [100, 100, 150])
+        # The running total is computed once per index.
+        self.assertIs(index.cumulative_scorable_bytes, index.cumulative_scorable_bytes)
+
 
 if __name__ == "__main__":
     unittest.main()
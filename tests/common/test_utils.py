@@ -1,8 +1,25 @@
+import datetime as dt
 import functools
+import os
+import tempfile
 import time
 import unittest
 
-from common.utils import run_in_thread
+from unittest import mock
+
+import numpy as np
+
+from common.utils import (
+    dump_state,
+    get_miner_uids,
+    get_validator_mask,
+    is_validator,
+    load_state,
+    run_in_thread,
+    time_bucket_id_from_datetime,
+    time_bucket_id_to_date_range,
+    ttl_cache,
+)
 
 
 class TestUtils(unittest.TestCase):
@@ -52,6 +69,114 @@ class TestUtils(unittest.TestCase):
         with self.assertRaises(ValueError):
             result = run_in_thread(func=partial, ttl=5)
 
+    def test_ttl_cache_returns_cached_value_within_ttl(self):
+        calls = []
+
+        @ttl_cache(ttl=60)
+        def test_func(a: int):
+            calls.append(a)
+            return a * 2
+
+        self.assertEqual(4, test_func(2))
+        self.assertEqual(4, test_func(2))
+        self.assertEqual([2], calls)
+
+    def test_ttl_cache_expires_entries(self):
+        calls = []
+
+        @ttl_cache(ttl=10)
+        def test_func(a: int):
+            calls.append(a)
+            return a
+
+        with mock.patch("common.utils.time.monotonic", return_value=100.0):
+            test_func(1)
+        with mock.patch("common.utils.time.monotonic", return_value=109.0):
+            test_func(1)
+        self.assertEqual([1], calls)
+
+        with mock.patch("common.utils.time.monotonic", return_value=111.0):
+            test_func(1)
+        self.assertEqual([1, 1], calls)
+
+    def test_ttl_cache_evicts_least_recently_used(self):
+        calls = []
+
+        @ttl_cache(maxsize=2, ttl=60)
+        def test_func(a: int, b: int = 0):
+            calls.append(a)
+            return a + b
+
+        test_func(1)
+        test_func(2)
+        # Touch 1 so that 2 becomes the least recently used entry.
+        test_func(1)
+        test_func(3)
+        test_func(1)
+        self.assertEqual([1, 2, 3], calls)
+
+        test_func(2)
+        self.assertEqual([1, 2, 3, 2], calls)
+
+        # Keyword arguments are keyed separately from positional arguments.
+        self.assertEqual(5, test_func(2, b=3))
+        self.assertEqual([1, 2, 3, 2, 2], calls)
+
+    def test_dump_and_load_state_roundtrip(self):
+        state = {
+            "labels": ["#bittensor", "r/bittensor_"],
+            "counts": {1: 10, 2: 20},
+            "raw": b"\x00\x01",
+            "missing": None,
+        }
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "state.bin")
+            dump_state(state, path)
+            self.assertEqual(state, load_state(path))
+
+    def test_dump_state_requires_unsafe_pickle_for_arbitrary_objects(self):
+        state = {"delta": dt.timedelta(seconds=5)}
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "state.bin")
+            with self.assertRaises(TypeError):
+                dump_state(state, path)
+
+            dump_state(state, path, unsafe_pickle=True)
+            with self.assertRaises(ValueError):
+                load_state(path)
+            self.assertEqual(state, load_state(path, unsafe_pickle=True))
+
+    def test_get_validator_mask_matches_is_validator(self):
+        metagraph = mock.Mock()
+        metagraph.validator_permit = np.array([True, True, False, True])
+        metagraph.S = np.array([20_000.0, 5_000.0, 50_000.0, 10_000.0])
+
+        mask = get_validator_mask(metagraph, vpermit_rao_limit=10_000)
+
+        self.assertEqual(
+            [is_validator(uid, metagraph, 10_000) for uid in range(4)],
+            mask.tolist(),
+        )
+        self.assertEqual([True, False, False, True], mask.tolist())
+
+    def test_get_miner_uids_excludes_validators(self):
+        metagraph = mock.Mock()
+        metagraph.uids = np.array([0, 1, 2, 3])
+        metagraph.validator_permit = np.array([True, True, False, True])
+        metagraph.S = np.array([20_000.0, 5_000.0, 50_000.0, 10_000.0])
+
+        self.assertEqual([1, 2], get_miner_uids(metagraph, vpermit_rao_limit=10_000))
+
+    def test_time_bucket_id_to_date_range(self):
+        now = dt.datetime(2024, 3, 1, 5, 30, tzinfo=dt.timezone.utc)
+
+        date_range = time_bucket_id_to_date_range(time_bucket_id_from_datetime(now))
+
+        self.assertEqual(dt.datetime(2024, 3, 1, 5, tzinfo=dt.timezone.utc), date_range.start)
+        self.assertEqual(dt.datetime(2024, 3, 1, 6, tzinfo=dt.timezone.utc), date_range.end)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -10,21 +10,22 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 
 # Now we can import the module we want to test from the 'neurons' package.
 from neurons import target_provider
+from scraping.config.model import ScraperConfig, LabelScrapingConfig
 
 # Sample data for mocking function returns
 MOCK_DYNAMIC_TARGETS = [{"id": "dynamic1"}, {"id": "dynamic2"}]
 MOCK_CACHED_TARGETS = [{"id": "cached1"}]
 
 @pytest.fixture(autouse=True)
-def clean_cache_file():
-    """A pytest fixture to ensure the cache file is removed before/after each test."""
-    # The cache file is created in the root, so we reference it from there.
-    cache_path = target_provider._CACHE_FILE_PATH
-    if os.path.exists(cache_path):
-        os.remove(cache_path)
+def clean_cache_file(tmp_path, monkeypatch):
+    """A pytest fixture to ensure each test starts without a cache file."""
+    # Point the cache at a temporary directory, so the tests never remove or overwrite the checked-in cache.
+    cache_path = str(tmp_path / "cached_targets.json")
+    monkeypatch.setattr(target_provider, "_CACHE_FILE_PATH", cache_path)
+    monkeypatch.setattr(target_provider, "_CACHE_HASH_FILE_PATH", cache_path + ".hash")
+    # Drop any targets memoized by an earlier test, so every test starts from Tier 1.
+    monkeypatch.setattr(target_provider, "_cached_targets", None)
     yield
-    if os.path.exists(cache_path):
-        os.remove(cache_path)
 
 def test_tier1_success_path():
     """
@@ -69,7 +70,7 @@ def test_tier1_and_tier2_fail_tier3_succeeds():
         mock_read.return_value = None
         result = target_provider.get_scraping_targets()
 
-        assert result == target_provider._STATIC_FALLBACK_TARGETS
+        assert result == target_provider._get_static_fallback_targets()
         mock_fetch.assert_called_once()
         mock_read.assert_called_once()
 
@@ -77,12 +78,74 @@ def test_cache_is_actually_written_on_tier1_success():
     """
     An integration-style test to verify the file write actually happens.
     """
+    dynamic_targets = {
+        "scraper_configs": {
+            "X.flash": ScraperConfig(
+                scraper_id="X.flash",
+                cadence_seconds=300,
+                labels_to_scrape=[LabelScrapingConfig(label_choices=["#dynamic1", "#dynamic2"])],
+            )
+        }
+    }
     with patch('neurons.target_provider._fetch_from_dynamic_source') as mock_fetch:
-        mock_fetch.return_value = MOCK_DYNAMIC_TARGETS
+        mock_fetch.return_value = dynamic_targets
         target_provider.get_scraping_targets()
 
         cache_path = target_provider._CACHE_FILE_PATH
         assert os.path.exists(cache_path)
         with open(cache_path, 'r') as f:
             data_from_disk = json.load(f)
-        assert data_from_disk == MOCK_DYNAMIC_TARGETS
+        assert data_from_disk == {
+            scraper_id: config.dict() for scraper_id, config in dynamic_targets["scraper_configs"].items()
+        }
+
+def test_tier1_targets_are_reused_within_ttl():
+    """
+    Verify a second call inside TARGETS_TTL_SECONDS skips both the dynamic source and the cache write.
+    """
+    with patch('neurons.target_provider._fetch_from_dynamic_source') as mock_fetch, \
+         patch('neurons.target_provider._write_to_local_cache') as mock_write:
+
+        mock_fetch.return_value = target_provider._get_static_fallback_targets()
+        first_result = target_provider.get_scraping_targets()
+        # Changing one caller's targets must not leak into what the next caller is given.
+        first_result["scraper_configs"]["X.flash"].cadence_seconds = 1
+        second_result = target_provider.get_scraping_targets()
+
+        assert second_result["scraper_configs"]["X.flash"].cadence_seconds == 300
+        mock_fetch.assert_called_once()
+        mock_write.assert_called_once()
+
+def test_fallback_targets_are_not_reused():
+    """
+    Verify Tier 2 and Tier 3 results are not memoized, so Tier 1 is retried on the next call.
+    """
+    with patch('neurons.target_provider._fetch_from_dynamic_source') as mock_fetch, \
+         patch('neurons.target_provider._read_from_local_cache') as mock_read:
+
+        mock_fetch.side_effect = IOError("Network is down")
+        mock_read.return_value = MOCK_CACHED_TARGETS
+        target_provider.get_scraping_targets()
+        mock_read.return_value = None
+        target_provider.get_scraping_targets()
+        target_provider.get_scraping_targets()
+
+        assert mock_fetch.call_count == 3
+        assert mock_read.call_count == 3
+
+def test_unchanged_cache_is_not_rewritten():
+    """
+    Verify a second write of identical targets leaves the cache file untouched.
+    """
+    targets = target_provider._get_static_fallback_targets()
+    target_provider._write_to_local_cache(targets)
+
+    cache_path = target_provider._CACHE_FILE_PATH
+    assert os.path.exists(cache_path)
+    with open(cache_path, 'r') as f:
+        data_from_disk = json.load(f)
+    assert set(data_from_disk) == set(targets["scraper_configs"])
+
+    with patch('neurons.target_provider.os.replace') as mock_replace:
+        target_provider._write_to_local_cache(target_provider._get_static_fallback_targets())
+        mock_replace.assert_not_called()
@@ -320,5 +320,74 @@ class TestDataValueCalculator(unittest.TestCase):
         self.assertAlmostEqual(score, 225.0, places=5)
 
 
+class TestDataValueCalculatorBatchScoring(unittest.TestCase):
+    def test_get_score_for_data_entity_buckets_matches_per_bucket_scores(self):
+        """Tests that scoring buckets together matches summing their individual scores."""
+        now = dt.datetime(2023, 12, 12, 12, 30, 0, tzinfo=dt.timezone.utc)
+        current_time_bucket = TimeBucket.from_datetime(now)
+        current_time_bucket_id = current_time_bucket.id
+
+        model = DataDesirabilityLookup(
+            distribution={
+                DataSource.REDDIT: DataSourceDesirability(
+                    weight=0.75,
+                    default_scale_factor=0.5,
+                    job_matcher=JobMatcher(jobs=[
+                        Job(id="undated", keyword=None, label="testlabel", job_weight=1.0),
+                        Job(
+                            id="dated",
+                            keyword=None,
+                            label="dated-label",
+                            job_weight=2.0,
+                            start_timebucket=current_time_bucket_id - 10,
+                            end_timebucket=current_time_bucket_id - 5,
+                        ),
+                    ]),
+                ),
+                DataSource.X: DataSourceDesirability(
+                    weight=0.25,
+                    default_scale_factor=0.8,
+                    job_matcher=JobMatcher(jobs=[
+                        Job(id="penalized", keyword=None, label="#penalizedlabel", job_weight=-1.0),
+                    ]),
+                ),
+            },
+            max_age_in_hours=constants.DATA_ENTITY_BUCKET_AGE_LIMIT_DAYS * 24,
+        )
+        value_calculator = DataValueCalculator(model=model)
+
+        buckets = [
+            ScorableDataEntityBucket(
+                time_bucket_id=current_time_bucket_id - age,
+                source=source,
+                label=label,
+                size_bytes=200,
+                scorable_bytes=100,
+            )
+            for age in (0, 7, 100, constants.DATA_ENTITY_BUCKET_AGE_LIMIT_DAYS * 24 + 1)
+            for source, label in [
+                (DataSource.REDDIT, "testlabel"),
+                (DataSource.REDDIT, "dated-label"),
+                (DataSource.REDDIT, "other-label"),
+                (DataSource.REDDIT, None),
+                (DataSource.X, "#penalizedlabel"),
+                (DataSource.X, "#other-label"),
+            ]
+        ]
+
+        expected = sum(
+            value_calculator.get_score_for_data_entity_bucket(bucket, current_time_bucket)
+            for bucket in buckets
+        )
+        self.assertAlmostEqual(
+            value_calculator.get_score_for_data_entity_buckets(buckets, current_time_bucket),
+            expected,
+            places=5,
+        )
+        self.assertEqual(
+            value_calculator.get_score_for_data_entity_buckets([], current_time_bucket), 0.0
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
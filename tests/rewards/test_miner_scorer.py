@@ -1,5 +1,7 @@
+import os
 import random
 import cProfile
+import tempfile
 import pstats
 import time
 import unittest
@@ -671,5 +673,122 @@ class TestMinerScorer(unittest.TestCase):
         print(f"Time to score {num_buckets} buckets:", time.time() - start)
 
 
+class TestMinerScorerState(unittest.TestCase):
+    """Tests saving, loading and publishing the scorer's state, independent of scoring."""
+
+    def setUp(self):
+        self.num_neurons = 10
+        self.scorer = MinerScorer(self.num_neurons, MagicMock())
+
+        # Give every per-miner tensor distinct values, so a field restored from the wrong entry is caught.
+        with self.scorer.lock:
+            for offset, (name, _) in enumerate(MinerScorer._PER_MINER_STATE):
+                getattr(self.scorer, name).copy_(
+                    torch.arange(self.num_neurons, dtype=torch.float32) + offset * 100
+                )
+            self.scorer._publish_scores()
+
+    def _assert_state_equal(self, expected: MinerScorer, actual: MinerScorer):
+        expected_arrays = expected.state_arrays()
+        actual_arrays = actual.state_arrays()
+        self.assertEqual(expected_arrays.keys(), actual_arrays.keys())
+        for name, array in expected_arrays.items():
+            self.assertEqual(array.shape, actual_arrays[name].shape, name)
+            self.assertTrue((array == actual_arrays[name]).all(), name)
+
+    def test_save_and_load_state(self):
+        """Tests that the scorer state round trips through save_state and load_state."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "scorer.pickle")
+            self.scorer.save_state(filepath)
+
+            loaded = MinerScorer(self.num_neurons, MagicMock())
+            loaded.load_state(filepath)
+
+        self._assert_state_equal(self.scorer, loaded)
+        self.assertTrue(torch.equal(self.scorer.get_scores(), loaded.get_scores()))
+
+    def test_load_legacy_torch_state(self):
+        """Tests loading state saved with torch.save, including (num_neurons, 1) credibility columns."""
+        legacy_state = {
+            "scores": self.scorer.scores.clone(),
+            "credibility": self.scorer.miner_credibility.clone().reshape(-1, 1),
+            "hf_boosts": self.scorer.hf_boosts.clone(),
+            "hf_credibility": self.scorer.hf_credibility.clone().reshape(-1, 1),
+            "s3_boosts": self.scorer.s3_boosts.clone(),
+            "s3_credibility": self.scorer.s3_credibility.clone().reshape(-1, 1),
+            "scorable_bytes": self.scorer.scorable_bytes.clone(),
+        }
+
+        for use_zip_format in (True, False):
+            with self.subTest(use_zip_format=use_zip_format):
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    filepath = os.path.join(tmp_dir, "scorer.pickle")
+                    torch.save(
+                        legacy_state, filepath, _use_new_zipfile_serialization=use_zip_format
+                    )
+
+                    loaded = MinerScorer(self.num_neurons, MagicMock())
+                    loaded.load_state(filepath)
+
+                    # The loaded state must not share storage with the memory mapped file.
+                    torch.save(
+                        {name: torch.zeros_like(tensor) for name, tensor in legacy_state.items()},
+                        filepath,
+                        _use_new_zipfile_serialization=use_zip_format,
+                    )
+
+                self._assert_state_equal(self.scorer, loaded)
+                self.assertEqual(loaded.miner_credibility.shape, (self.num_neurons,))
+
+    def test_load_legacy_torch_state_without_s3_fields(self):
+        """Tests that state saved before S3 scoring existed loads with the S3 starting values."""
+        legacy_state = {
+            "scores": self.scorer.scores.clone(),
+            "credibility": self.scorer.miner_credibility.clone().reshape(-1, 1),
+            "hf_boosts": self.scorer.hf_boosts.clone(),
+            "hf_credibility": self.scorer.hf_credibility.clone(),
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "scorer.pickle")
+            torch.save(legacy_state, filepath)
+
+            loaded = MinerScorer(self.num_neurons, MagicMock())
+            loaded.load_state(filepath)
+
+        self.assertTrue(torch.equal(loaded.scores, self.scorer.scores))
+        self.assertTrue(torch.equal(loaded.s3_boosts, torch.zeros(self.num_neurons)))
+        self.assertTrue(
+            torch.equal(
+                loaded.s3_credibility,
+                torch.full((self.num_neurons,), MinerScorer.STARTING_S3_CREDIBILITY),
+            )
+        )
+        self.assertTrue(torch.equal(loaded.scorable_bytes, torch.zeros(self.num_neurons)))
+
+    def test_get_scores_after_growing_backing(self):
+        """Tests that get_scores returns the published scores after the backing tensors are reallocated."""
+        expected_scores = self.scorer.get_scores()
+        capacity = self.scorer._capacity
+
+        new_num_neurons = capacity + 1
+        self.scorer.resize(new_num_neurons)
+        self.assertGreater(self.scorer._capacity, capacity)
+
+        scores = self.scorer.get_scores()
+        self.assertEqual(scores.shape, (new_num_neurons,))
+        self.assertTrue(torch.equal(scores[: self.num_neurons], expected_scores))
+        self.assertTrue(
+            torch.equal(scores[self.num_neurons :], torch.zeros(new_num_neurons - self.num_neurons))
+        )
+
+        # Later updates are published, and callers cannot modify the published snapshot.
+        self.scorer.reset(0)
+        scores = self.scorer.get_scores()
+        self.assertEqual(scores[0], 0.0)
+        scores[1] = -1.0
+        self.assertEqual(self.scorer.get_scores()[1], expected_scores[1])
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
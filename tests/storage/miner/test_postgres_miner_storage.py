@@ -0,0 +1,107 @@
+import contextlib
+import datetime as dt
+import unittest
+
+from common import utils
+from common.data import CompressedMinerIndex, DataSource
+
+from storage.miner.sqlite_miner_storage import PostgresMinerStorage
+
+
+class FakeAggregateCursor:
+    """Answers the compressed index aggregation from in-memory bucket sizes, honoring its parameters."""
+
+    def __init__(self, bucket_sizes):
+        self.bucket_sizes = bucket_sizes
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, query, params):
+        size_limit, oldest_time_bucket_id, bucket_count_limit = params
+        buckets = sorted(
+            (item for item in self.bucket_sizes.items() if item[0][0] >= oldest_time_bucket_id),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        self.rows = [
+            (time_bucket_id, source, label, min(size, size_limit))
+            for (time_bucket_id, source, label), size in buckets[:bucket_count_limit]
+        ]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class FakeConnection:
+    def __init__(self, bucket_sizes):
+        self.bucket_sizes = bucket_sizes
+        self.aggregations = 0
+
+    def cursor(self, name=None):
+        self.aggregations += 1
+        return FakeAggregateCursor(self.bucket_sizes)
+
+
+class TestPostgresMinerStorageCompressedIndex(unittest.TestCase):
+    def setUp(self):
+        # Constructing the storage does not connect, so it can be pointed at a fake connection.
+        self.test_storage = PostgresMinerStorage()
+        self.test_storage._schema_ready = True
+
+        newest_time_bucket_id = utils.time_bucket_id_from_datetime(
+            dt.datetime.now(dt.timezone.utc)
+        )
+        # Five buckets across two sources and labels, each a distinct size.
+        self.bucket_sizes = {
+            (newest_time_bucket_id - i, DataSource.REDDIT if i % 2 else DataSource.X, f"label_{i % 3}"): (i + 1) * 100
+            for i in range(5)
+        }
+        self.connection = FakeConnection(self.bucket_sizes)
+        self.test_storage._create_connection = contextlib.contextmanager(
+            lambda: (yield self.connection)
+        )
+
+    def test_compute_compressed_index_respects_bucket_count_limit(self):
+        """Tests that a smaller bucket count limit returns fewer buckets, keeping the largest ones."""
+        full_index = self.test_storage._compute_compressed_index()
+        limited_index = self.test_storage._compute_compressed_index(bucket_count_limit=2)
+
+        self.assertEqual(CompressedMinerIndex.bucket_count(full_index), 5)
+        self.assertEqual(CompressedMinerIndex.bucket_count(limited_index), 2)
+        self.assertEqual(CompressedMinerIndex.size_bytes(limited_index), 500 + 400)
+
+    def test_get_compressed_index_caches_each_bucket_count_limit(self):
+        """Tests that the cached index is kept per bucket count limit, rather than shared across limits."""
+        full_index = self.test_storage.get_compressed_index()
+        limited_index = self.test_storage.get_compressed_index(bucket_count_limit=2)
+
+        self.assertEqual(CompressedMinerIndex.bucket_count(full_index), 5)
+        self.assertEqual(CompressedMinerIndex.bucket_count(limited_index), 2)
+        self.assertEqual(self.connection.aggregations, 2)
+
+        # Both limits are now served from the cache.
+        self.assertIs(self.test_storage.get_compressed_index(), full_index)
+        self.assertIs(self.test_storage.get_compressed_index(bucket_count_limit=2), limited_index)
+        self.assertIs(self.test_storage.cached_index_4, full_index)
+        self.assertEqual(self.connection.aggregations, 2)
+
+    def test_refresh_compressed_index_only_refreshes_requested_limit(self):
+        """Tests that refreshing one limit's index leaves the other limits' cached indexes alone."""
+        limited_index = self.test_storage.get_compressed_index(bucket_count_limit=2)
+
+        self.test_storage.refresh_compressed_index(time_delta=dt.timedelta(minutes=1))
+
+        self.assertEqual(self.connection.aggregations, 2)
+        self.assertEqual(
+            CompressedMinerIndex.bucket_count(self.test_storage.cached_index_4), 5
+        )
+        self.assertIs(self.test_storage.get_compressed_index(bucket_count_limit=2), limited_index)
+
+
+if __name__ == "__main__":
+    unittest.main()
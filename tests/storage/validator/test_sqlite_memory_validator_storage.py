@@ -434,6 +434,18 @@ class TestSqliteMemoryValidatorStorage(unittest.TestCase):
         # Confirm the last updated is None.
         self.assertEqual(None, last_updated)
 
+    def test_read_miners_last_updated(self):
+        """Tests getting the last time several miners were updated in one call."""
+        now = dt.datetime.utcnow()
+        now_str = now.strftime("%Y-%m-%d %H:%M:%S.%f")
+        self.test_storage._upsert_miner("test_hotkey", now_str, 1)
+
+        last_updated = self.test_storage.read_miners_last_updated(
+            ["test_hotkey", "test_hotkey2"]
+        )
+
+        self.assertEqual({"test_hotkey": now, "test_hotkey2": None}, last_updated)
+
     @unittest.skip("Skip the multi threaded test by default.")
     def test_multithreaded_inserts(self):
         """In a multi-threaded environment, insert 5 indexes for 5 miners, then read them back and verify they're correct."""
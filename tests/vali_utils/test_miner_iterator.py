@@ -68,6 +68,13 @@ class TestMinerIterator(unittest.TestCase):
         self.assertEqual(next(iterator), 3)
         self.assertEqual(next(iterator), 4)
 
+    def test_len(self):
+        iterator = MinerIterator([3, 1, 2])
+        self.assertEqual(len(iterator), 3)
+
+        iterator.set_miner_uids([1, 2])
+        self.assertEqual(len(iterator), 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,10 @@
-import copy
+import dataclasses
 import datetime
 import traceback
 import asyncio
 import threading
 import os
+import queue
 from common import constants
 from common.data_v2 import ScorableMinerIndex
 from common.metagraph_syncer import MetagraphSyncer
@@ -31,7 +32,7 @@ from storage.validator.s3_validator_storage import S3ValidationStorage
 from vali_utils.miner_iterator import MinerIterator
 from vali_utils import utils as vali_utils
 
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from vali_utils.validator_s3_access import ValidatorS3Access
 from vali_utils.hf_utils import (
     get_latest_commit_files,
@@ -45,9 +46,24 @@ from vali_utils.hf_utils import (
 from rewards.miner_scorer import MinerScorer
 
 
+@dataclasses.dataclass(slots=True)
+class _PrefetchedQueries:
+    """Results of the index and bucket queries issued for a whole eval batch."""
+
+    # The hotkey that was queried, used to discard results for a uid that has since been re-registered.
+    hotkey: str
+    # The latest known index for the miner, or None if the miner has never provided one.
+    index: Optional[ScorableMinerIndex]
+    # The bucket chosen from the index. None if there is no index.
+    data_entity_bucket: Optional[DataEntityBucket] = None
+    # The responses to the GetDataEntityBucket query for the chosen bucket.
+    data_entity_bucket_responses: Optional[List[GetDataEntityBucket]] = None
+
+
 class MinerEvaluator:
     """MinerEvaluator is responsible for evaluating miners and updating their scores."""
 
+    # The name is kept from when the scorer was pickled, so existing state keeps loading.
     SCORER_FILENAME = "scorer.pickle"
 
     # Mapping of scrapers to use based on the data source to validate.
@@ -85,16 +101,30 @@ class MinerEvaluator:
         self.is_running: bool = False
         self.lock = threading.RLock()
         self.is_setup = False
+        # The next batch of uids and their prefetched queries, issued while the previous batch was evaluated.
+        self._prefetched_batch: Optional[
+            Tuple[List[int], Dict[int, _PrefetchedQueries]]
+        ] = None
+        # Holds at most the latest scorer snapshot waiting to be written by the state writer thread.
+        self._save_queue: queue.Queue = queue.Queue(maxsize=1)
+        self._state_writer_thread = threading.Thread(
+            target=self._state_writer, daemon=True, name="EvaluatorStateWriter"
+        )
+        self._state_writer_thread.start()
 
     def get_scorer(self) -> MinerScorer:
         """Returns the scorer used by the evaluator."""
         return self.scorer
 
-    def eval_miner_sync(self, uid: int) -> None:
+    def eval_miner_sync(
+        self, uid: int, prefetched: Optional[_PrefetchedQueries] = None
+    ) -> None:
         """Synchronous version of eval_miner."""
-        asyncio.run(self.eval_miner(uid))
+        asyncio.run(self.eval_miner(uid, prefetched))
 
-    async def eval_miner(self, uid: int) -> None:
+    async def eval_miner(
+        self, uid: int, prefetched: Optional[_PrefetchedQueries] = None
+    ) -> None:
         """Evaluates a miner and updates their score.
 
         Specifically:
@@ -103,6 +133,9 @@ class MinerEvaluator:
             3. Performs basic validation on the data entity bucket (right labels, matching size, etc.)
             4. Samples data from the data entity bucket and verifies the data is correct
             5. Passes the validation result to the scorer to update the miner's score.
+
+        If prefetched is provided, the index and bucket queries already issued for the batch are used
+        instead of querying the miner again.
         """
 
         axon_info = None
@@ -114,7 +147,10 @@ class MinerEvaluator:
         bt.logging.info(f"{hotkey}: Evaluating miner.")
 
         # Query the miner for the latest index.
-        index = await self._update_and_get_miner_index(hotkey, uid, axon_info)
+        if prefetched is None:
+            index = await self._update_and_get_miner_index(hotkey, uid, axon_info)
+        else:
+            index = prefetched.index
         if not index:
             # The miner hasn't provided an index yet, so we can't validate them. Count as a failed validation.
             bt.logging.info(
@@ -151,23 +187,27 @@ class MinerEvaluator:
         ##########
 
         # From that index, find a data entity bucket to sample and get it from the miner.
-        chosen_data_entity_bucket: DataEntityBucket = (
-            vali_utils.choose_data_entity_bucket_to_query(index)
-        )
-        bt.logging.info(
-            f"{hotkey} Querying miner for Bucket ID: {chosen_data_entity_bucket.id}."
-        )
-
-        responses = None
-        async with bt.dendrite(wallet=self.wallet) as dendrite:
-            responses = await dendrite.forward(
-                axons=[axon_info],
-                synapse=GetDataEntityBucket(
-                    data_entity_bucket_id=chosen_data_entity_bucket.id,
-                    version=constants.PROTOCOL_VERSION,
-                ),
-                timeout=140,
+        if prefetched is None:
+            chosen_data_entity_bucket: DataEntityBucket = (
+                vali_utils.choose_data_entity_bucket_to_query(index)
             )
+            bt.logging.info(
+                f"{hotkey} Querying miner for Bucket ID: {chosen_data_entity_bucket.id}."
+            )
+
+            responses = None
+            async with bt.dendrite(wallet=self.wallet) as dendrite:
+                responses = await dendrite.forward(
+                    axons=[axon_info],
+                    synapse=GetDataEntityBucket(
+                        data_entity_bucket_id=chosen_data_entity_bucket.id,
+                        version=constants.PROTOCOL_VERSION,
+                    ),
+                    timeout=140,
+                )
+        else:
+            chosen_data_entity_bucket = prefetched.data_entity_bucket
+            responses = prefetched.data_entity_bucket_responses
 
         data_entity_bucket = vali_utils.get_single_successful_response(
             responses, GetDataEntityBucket
@@ -510,14 +550,96 @@ class MinerEvaluator:
     async def run_next_eval_batch(self) -> int:
         """Asynchronously runs the next batch of miner evaluations and returns the number of seconds to wait until the next batch.
 
+        While a batch is being evaluated, the following batch is drawn and its index and bucket queries
+        are issued, so the next call starts evaluating straight away.
+
         Args:
             block (int): The block at which we started this evaluation.
         """
 
-        # Grab a snapshot of the metagraph
+        # Grab a snapshot of the metagraph.
+        # Synced metagraphs are replaced rather than mutated, so holding a reference is enough.
         metagraph = None
         with self.lock:
-            metagraph = copy.deepcopy(self.metagraph)
+            metagraph = self.metagraph
+
+        if self._prefetched_batch is not None:
+            # Use the batch that was prefetched while the previous batch was evaluated.
+            uids_to_eval, prefetched = self._prefetched_batch
+            self._prefetched_batch = None
+        else:
+            uids_to_eval, wait_secs = self._draw_eval_batch(metagraph)
+            if not uids_to_eval:
+                return wait_secs
+
+            # Query the whole batch for indexes and buckets up front, so each phase is a single fan out.
+            prefetched = await self._prefetch_batch_queries(uids_to_eval, metagraph)
+
+        # Drop any prefetched results for uids whose hotkey has changed since they were queried.
+        # Miners missing from the result are queried individually by eval_miner instead.
+        hotkeys = metagraph.hotkeys
+        prefetched = {
+            uid: queries
+            for uid, queries in prefetched.items()
+            if queries.hotkey == hotkeys[uid]
+        }
+
+        bt.logging.info(
+            f"Running validation on the following batch of uids: {uids_to_eval}."
+        )
+
+        threads = [
+            threading.Thread(
+                target=self.eval_miner_sync, args=(uid, prefetched.get(uid))
+            )
+            for uid in uids_to_eval
+        ]
+        for thread in threads:
+            thread.start()
+
+        def wait_for_evals():
+            bt.logging.trace(f"Waiting for {len(threads)} miner evals to finish.")
+            end = datetime.datetime.now() + datetime.timedelta(seconds=300)
+            for t in threads:
+                # Compute the timeout, so that all threads are waited for a total of 5 minutes.
+                timeout = max(0, (end - datetime.datetime.now()).total_seconds())
+                t.join(timeout=timeout)
+            bt.logging.trace(f"Finished waiting for {len(threads)} miner eval.")
+
+        async def prefetch_next_batch():
+            try:
+                # Skip the miners being evaluated, which may be drawn again on small networks.
+                next_uids, _ = self._draw_eval_batch(
+                    metagraph, exclude=set(uids_to_eval)
+                )
+                if next_uids:
+                    bt.logging.info(
+                        f"Prefetching queries for the next batch of uids: {next_uids}."
+                    )
+                    self._prefetched_batch = (
+                        next_uids,
+                        await self._prefetch_batch_queries(next_uids, metagraph),
+                    )
+            except Exception:
+                bt.logging.error(
+                    "Failed to prefetch the next eval batch.", traceback.format_exc()
+                )
+
+        # Wait for the evals off the event loop, so the next batch's queries run while they finish.
+        await asyncio.gather(asyncio.to_thread(wait_for_evals), prefetch_next_batch())
+
+        # Run the next evaluation batch immediately.
+        return 0
+
+    def _draw_eval_batch(
+        self, metagraph: bt.metagraph, exclude: Optional[set] = None
+    ) -> Tuple[List[int], float]:
+        """Draws the next batch of miners that are due an evaluation from the miner iterator.
+
+        Returns the uids to evaluate and, if there are none because the next miner is not due an update
+        yet, the number of seconds until it is. Uids in exclude are never drawn into the batch.
+        """
+        exclude = exclude or set()
 
         # Check if the next miner is due an update.
         next_uid = self.miner_iterator.peek()
@@ -532,49 +654,82 @@ class MinerEvaluator:
         # If the next miner is not due an update, then all subsequent miners are also not due an update.
         # So we wait until this miner is due an update.
         if not due_update:
-            return (
+            return [], (
                 last_evaluated + constants.MIN_EVALUATION_PERIOD - now
             ).total_seconds()
 
         # Run in batches of 15.
         miners_to_eval = 15
 
-        # Otherwise, execute the next batch of evaluations.
-        # Use a set in case the network has fewer than 15 miners.
-        uids_to_eval = {next(self.miner_iterator) for _ in range(miners_to_eval)}
-
-        bt.logging.info(
-            f"Running validation on the following batch of uids: {uids_to_eval}."
-        )
-        threads = [
-            threading.Thread(target=self.eval_miner_sync, args=(uid,))
-            for uid in uids_to_eval
-        ]
-        for thread in threads:
-            thread.start()
-
-        bt.logging.trace(f"Waiting for {len(threads)} miner evals to finish.")
-        end = datetime.datetime.now() + datetime.timedelta(seconds=300)
-        for t in threads:
-            # Compute the timeout, so that all threads are waited for a total of 5 minutes.
-            timeout = max(0, (end - datetime.datetime.now()).total_seconds())
-            t.join(timeout=timeout)
-        bt.logging.trace(f"Finished waiting for {len(threads)} miner eval.")
+        # Otherwise, draw candidates from the iterator, skipping any that were evaluated within the
+        # evaluation period, and refill until the batch is full. Draw at most one full cycle, in case
+        # the network has fewer than 15 miners due an update.
+        hotkeys = metagraph.hotkeys
+        max_draws = len(self.miner_iterator)
+        draws = 0
+        uids_to_eval = []
+        while len(uids_to_eval) < miners_to_eval and draws < max_draws:
+            candidates = []
+            while len(uids_to_eval) + len(candidates) < miners_to_eval and draws < max_draws:
+                candidates.append(next(self.miner_iterator))
+                draws += 1
+
+            # Read when every candidate was last evaluated in one query.
+            last_updated = self.storage.read_miners_last_updated(
+                [hotkeys[uid] for uid in candidates]
+            )
+            for uid in candidates:
+                candidate_last_evaluated = last_updated[hotkeys[uid]]
+                if uid not in uids_to_eval and uid not in exclude and (
+                    candidate_last_evaluated is None
+                    or (now - candidate_last_evaluated) >= constants.MIN_EVALUATION_PERIOD
+                ):
+                    uids_to_eval.append(uid)
 
-        # Run the next evaluation batch immediately.
-        return 0
+        return uids_to_eval, 0
 
     def save_state(self):
-        """Saves the state of the validator to a file."""
+        """Saves the state of the validator to a file.
+
+        The scorer is snapshotted here and written to disk by the state writer thread. If a previous
+        snapshot is still waiting to be written, it is replaced by this one.
+        """
         bt.logging.trace("Saving evaluator state.")
 
-        if not os.path.exists(self.config.neuron.full_path):
-            os.makedirs(self.config.neuron.full_path)
+        snapshot = self.scorer.state_arrays()
+        while True:
+            try:
+                self._save_queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                # Drop the stale pending snapshot in favour of the latest one.
+                try:
+                    self._save_queue.get_nowait()
+                    self._save_queue.task_done()
+                except queue.Empty:
+                    pass
+
+    def _state_writer(self):
+        """Writes queued scorer snapshots to disk until the process exits."""
+        while True:
+            snapshot = self._save_queue.get()
+            try:
+                if not os.path.exists(self.config.neuron.full_path):
+                    os.makedirs(self.config.neuron.full_path)
 
-        # Save the state of the validator to file.
-        self.scorer.save_state(
-            os.path.join(self.config.neuron.full_path, MinerEvaluator.SCORER_FILENAME)
-        )
+                # Save the state of the validator to file.
+                MinerScorer.write_state_arrays(
+                    os.path.join(
+                        self.config.neuron.full_path, MinerEvaluator.SCORER_FILENAME
+                    ),
+                    snapshot,
+                )
+            except Exception:
+                bt.logging.error(
+                    f"Failed to save evaluator state: {traceback.format_exc()}"
+                )
+            finally:
+                self._save_queue.task_done()
 
     def load_state(self):
         """Loads the state of the validator from a file."""
@@ -600,6 +755,88 @@ class MinerEvaluator:
             # Resize the scorer in case the loaded state is old and missing newly added neurons.
             self.scorer.resize(len(self.metagraph.hotkeys))
 
+    async def _prefetch_batch_queries(
+        self, uids: List[int], metagraph: bt.metagraph
+    ) -> Dict[int, _PrefetchedQueries]:
+        """Queries all miners in a batch for their index, then for a bucket chosen from that index.
+
+        The index queries are issued as one fan out over a single dendrite session, rather than one
+        session per miner per query. Each miner's bucket query is sent on the same session as soon as
+        its index is stored. Returns an empty dict if the batch queries fail.
+        """
+        # Bind the metagraph attributes once rather than looking them up per uid.
+        all_hotkeys = metagraph.hotkeys
+        all_axons = metagraph.axons
+        hotkeys = [all_hotkeys[uid] for uid in uids]
+        axons = [all_axons[uid] for uid in uids]
+
+        bt.logging.info(f"Getting MinerIndex from {len(uids)} miners.")
+
+        try:
+            async with bt.dendrite(wallet=self.wallet) as dendrite:
+                index_responses = await dendrite.forward(
+                    axons=axons,
+                    synapse=GetMinerIndex(version=constants.PROTOCOL_VERSION),
+                    timeout=120,
+                )
+
+                # Snapshot credibilities once for the batch rather than taking the scorer lock per miner.
+                credibilities = self.scorer.get_credibilities()
+
+                async def prefetch_miner(
+                    uid: int, hotkey: str, axon: bt.AxonInfo, response: GetMinerIndex
+                ) -> _PrefetchedQueries:
+                    # Store the index off the event loop, so the bucket queries of miners whose
+                    # index is already stored proceed while this one is written.
+                    index = await asyncio.to_thread(
+                        self._store_and_get_miner_index,
+                        hotkey,
+                        uid,
+                        [response],
+                        credibilities[uid].item(),
+                    )
+                    if not index:
+                        return _PrefetchedQueries(hotkey=hotkey, index=None)
+
+                    chosen_data_entity_bucket = (
+                        vali_utils.choose_data_entity_bucket_to_query(index)
+                    )
+                    bt.logging.info(
+                        f"{hotkey} Querying miner for Bucket ID: {chosen_data_entity_bucket.id}."
+                    )
+                    bucket_response = await dendrite.call(
+                        target_axon=axon,
+                        synapse=GetDataEntityBucket(
+                            data_entity_bucket_id=chosen_data_entity_bucket.id,
+                            version=constants.PROTOCOL_VERSION,
+                        ),
+                        timeout=140,
+                    )
+                    return _PrefetchedQueries(
+                        hotkey=hotkey,
+                        index=index,
+                        data_entity_bucket=chosen_data_entity_bucket,
+                        data_entity_bucket_responses=[bucket_response],
+                    )
+
+                results = await asyncio.gather(
+                    *(
+                        prefetch_miner(uid, hotkey, axon, response)
+                        for uid, hotkey, axon, response in zip(
+                            uids, hotkeys, axons, index_responses
+                        )
+                    )
+                )
+                prefetched: Dict[int, _PrefetchedQueries] = dict(zip(uids, results))
+
+            return prefetched
+        except Exception:
+            bt.logging.error(
+                f"Failed to prefetch queries for uids {uids}.",
+                traceback.format_exc(),
+            )
+            return {}
+
     async def _update_and_get_miner_index(
         self, hotkey: str, uid: int, miner_axon: bt.AxonInfo
     ) -> Optional[ScorableMinerIndex]:
@@ -615,7 +852,30 @@ class MinerEvaluator:
                     synapse=GetMinerIndex(version=constants.PROTOCOL_VERSION),
                     timeout=120,
                 )
+        except Exception:
+            bt.logging.error(
+                f"{hotkey} Failed to update and get miner index.",
+                traceback.format_exc(),
+            )
+            return None
 
+        return await asyncio.to_thread(
+            self._store_and_get_miner_index, hotkey, uid, responses
+        )
+
+    def _store_and_get_miner_index(
+        self,
+        hotkey: str,
+        uid: int,
+        responses: List[GetMinerIndex],
+        miner_credibility: Optional[float] = None,
+    ) -> Optional[ScorableMinerIndex]:
+        """Stores the index from a GetMinerIndex response, and returns the latest known index or None if the miner hasn't yet provided an index.
+
+        miner_credibility is read from the scorer if not provided.
+        """
+
+        try:
             response = vali_utils.get_single_successful_response(
                 responses, GetMinerIndex
             )
@@ -640,7 +900,8 @@ class MinerEvaluator:
             assert miner_index is not None, "Miner index should not be None."
 
             # Miner replied with a valid index. Store it and return it.
-            miner_credibility = self.scorer.get_miner_credibility(uid)
+            if miner_credibility is None:
+                miner_credibility = self.scorer.get_miner_credibility(uid)
             bt.logging.success(
                 f"{hotkey}: Got new compressed miner index of {CompressedMinerIndex.size_bytes(miner_index)} bytes "
                 + f"across {CompressedMinerIndex.bucket_count(miner_index)} buckets."
@@ -725,8 +986,9 @@ class MinerEvaluator:
             )
             # Zero out all hotkeys that have been replaced.
             old_hotkeys = self.metagraph.hotkeys
+            new_hotkeys = metagraph.hotkeys
             for uid, hotkey in enumerate(old_hotkeys):
-                if hotkey != metagraph.hotkeys[uid] or (
+                if hotkey != new_hotkeys[uid] or (
                     not utils.is_miner(uid, metagraph, self.vpermit_rao_limit)
                     and not utils.is_validator(uid, metagraph, self.vpermit_rao_limit)
                 ):
@@ -741,20 +1003,24 @@ class MinerEvaluator:
                             f"{hotkey} Failed to delete miner index.",
                             traceback.format_exc(),
                         )
-            # Update the iterator. It will keep its current position if possible.
+            # Update the iterator from the new metagraph so newly registered miners join the rotation.
+            # It will keep its current position if possible.
             self.miner_iterator.set_miner_uids(
-                utils.get_miner_uids(self.metagraph, self.vpermit_rao_limit)
+                utils.get_miner_uids(metagraph, self.vpermit_rao_limit)
             )
 
             # Check to see if the metagraph has changed size.
             # If so, we need to add new hotkeys and moving averages.
-            if len(self.metagraph.hotkeys) < len(metagraph.hotkeys):
-                self.scorer.resize(len(metagraph.hotkeys))
+            if len(old_hotkeys) < len(new_hotkeys):
+                self.scorer.resize(len(new_hotkeys))
 
-            self.metagraph = copy.deepcopy(metagraph)
+            # The syncer hands each listener a freshly fetched metagraph that is never mutated, so no copy is needed.
+            self.metagraph = metagraph
 
 
 
     def exit(self):
         self.should_exit = True
+        # Wait for any pending state snapshot to be written.
+        self._save_queue.join()
 
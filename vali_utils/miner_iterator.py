@@ -1,5 +1,4 @@
 import bisect
-import copy
 import threading
 from typing import List
 
@@ -14,7 +13,7 @@ class MinerIterator:
     """
 
     def __init__(self, miner_uids: List[int]):
-        self.miner_uids = sorted(copy.deepcopy(miner_uids))
+        self.miner_uids = sorted(miner_uids)
         # Start the index at a random position. This helps ensure that miners with high UIDs aren't penalized if
         # the validator restarts frequently.
         self.index = random.randint(0, len(self.miner_uids) - 1)
@@ -23,6 +22,11 @@ class MinerIterator:
     def __iter__(self):
         return self
 
+    def __len__(self) -> int:
+        """Returns the number of miner UIDs in one cycle of the iterator."""
+        with self.lock:
+            return len(self.miner_uids)
+
     def __next__(self) -> int:
         with self.lock:
             if len(self.miner_uids) == 0:
@@ -51,7 +55,7 @@ class MinerIterator:
         returned by the iterator. This helps ensure that frequent updates to the miner_uids does not cause too much
         churn in the sequence of UIDs returned by the iterator.
         """
-        sorted_uids = sorted(copy.deepcopy(miner_uids))
+        sorted_uids = sorted(miner_uids)
         with self.lock:
             next_uid = self.miner_uids[self.index]
             new_index = bisect.bisect_left(sorted_uids, next_uid)
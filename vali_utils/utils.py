@@ -1,9 +1,11 @@
 import bittensor as bt
+from bisect import bisect_right
 import hashlib
+from itertools import accumulate
+import numpy as np
 import random
 import time
 from typing import List, Optional, Tuple, Type, Union
-import datetime as dt
 from common import constants
 from common.data import (
     CompressedMinerIndex,
@@ -22,52 +24,54 @@ def choose_data_entity_bucket_to_query(index: ScorableMinerIndex) -> DataEntityB
     """Securely pick one DataEntityBucket to validate.
     Uses a seed based on system time.
     """
-    total_size = sum(
-        scorable_bucket.scorable_bytes 
-        for scorable_bucket in index.scorable_data_entity_buckets
-    )
-    
+    cumulative_bytes = index.cumulative_scorable_bytes
+    assert (
+        len(cumulative_bytes) > 0
+    ), "Failed to choose a DataEntityBucket to query... which should never happen"
+
     # Use nanosecond precision timestamp as seed
     seed = time.time_ns()
     rng = Random(seed)
-    chosen_byte = rng.uniform(0, total_size)
-    
-    iterated_bytes = 0
-    for scorable_bucket in index.scorable_data_entity_buckets:
-        if iterated_bytes + scorable_bucket.scorable_bytes >= chosen_byte:
-            return scorable_bucket.to_data_entity_bucket()
-        iterated_bytes += scorable_bucket.scorable_bytes
-    assert (
-        False
-    ), "Failed to choose a DataEntityBucket to query... which should never happen"
+    chosen_byte = rng.random() * int(cumulative_bytes[-1])
+
+    # side="right" finds the first bucket whose running total exceeds chosen_byte,
+    # which also skips over buckets with no scorable bytes.
+    chosen_index = int(np.searchsorted(cumulative_bytes, chosen_byte, side="right"))
+    # Only reachable if no bucket has any scorable bytes.
+    chosen_index = min(chosen_index, len(cumulative_bytes) - 1)
+    return index.scorable_data_entity_buckets[chosen_index].to_data_entity_bucket()
 
 def choose_entities_to_verify(entities: List[DataEntity]) -> List[DataEntity]:
     """Given a list of DataEntities from a DataEntityBucket, chooses a random set of entities to verify."""
 
     # For now, we just sample 2 entities, based on size. Ensure we choose different entities.
     # In future, consider sampling every N bytes.
-    chosen_entities = []
-    total_size = sum(entity.content_size_bytes for entity in entities)
+    sizes = [entity.content_size_bytes for entity in entities]
+    cumulative_sizes = list(accumulate(sizes))
+    total_size = cumulative_sizes[-1] if cumulative_sizes else 0
 
     # Ensure we don't try to choose more entities than exist to choose from.
     num_entities_to_choose = min(2, len(entities))
+    chosen_indexes = []
     for _ in range(num_entities_to_choose):
-        chosen_byte = random.uniform(0, total_size)
-        iterated_bytes = 0
-        for entity in entities:
-            if entity in chosen_entities:
-                # Ensure we skip over already chosen entities if we see them again.
-                continue
-
-            if iterated_bytes + entity.content_size_bytes >= chosen_byte:
-                chosen_entities.append(entity)
-                # Adjust total_size to account for the entity we already selected.
-                total_size -= entity.content_size_bytes
-                break
+        if total_size <= 0:
+            # Only empty entities are left, so take the first one not already chosen.
+            chosen_index = next(
+                i for i in range(len(entities)) if i not in chosen_indexes
+            )
+        else:
+            chosen_byte = random.random() * total_size
+            # Ensure we skip over already chosen entities by shifting past their bytes.
+            for i in sorted(chosen_indexes):
+                if chosen_byte >= cumulative_sizes[i] - sizes[i]:
+                    chosen_byte += sizes[i]
+            chosen_index = bisect_right(cumulative_sizes, chosen_byte)
 
-            iterated_bytes += entity.content_size_bytes
+        chosen_indexes.append(chosen_index)
+        # Adjust total_size to account for the entity we already selected.
+        total_size -= sizes[chosen_index]
 
-    return chosen_entities
+    return [entities[i] for i in chosen_indexes]
 
 
 def are_entities_valid(
@@ -79,38 +83,49 @@ def are_entities_valid(
     and reason is a string describing why they are not valid.
     """
 
-    # Check the entity size, labels, source, and timestamp.
-    actual_size = 0
-    claimed_size = 0
+    # Check the entity labels, source, and timestamp.
+    expected_source = data_entity_bucket.id.source
+    expected_label = data_entity_bucket.id.label
     expected_datetime_range: DateRange = TimeBucket.to_date_range(
         data_entity_bucket.id.time_bucket
     )
+    # Compare against the range bounds directly to avoid a call per entity.
+    range_start = expected_datetime_range.start
+    range_end = expected_datetime_range.end
+    # The range is in UTC, so naive entity datetimes can be compared to the same bounds without their tzinfo,
+    # rather than building a new UTC datetime for each entity.
+    naive_range_start = range_start.replace(tzinfo=None)
+    naive_range_end = range_end.replace(tzinfo=None)
 
     for entity in entities:
-        actual_size += len(entity.content or b"")
-        claimed_size += entity.content_size_bytes
-        if entity.source != data_entity_bucket.id.source:
+        if entity.source != expected_source:
             return (
                 False,
-                f"Entity source {entity.source} does not match data_entity_bucket source {data_entity_bucket.id.source}",
+                f"Entity source {entity.source} does not match data_entity_bucket source {expected_source}",
             )
-        if entity.label != data_entity_bucket.id.label:
+        if entity.label != expected_label:
             return (
                 False,
-                f"Entity label {entity.label} does not match data_entity_bucket label {data_entity_bucket.id.label}",
+                f"Entity label {entity.label} does not match data_entity_bucket label {expected_label}",
             )
 
-        tz_datetime = entity.datetime
+        entity_datetime = entity.datetime
         # If the data entity does not specify any timezone information then use UTC for validation checks.
-        if tz_datetime.tzinfo is None:
-            tz_datetime = tz_datetime.replace(tzinfo=dt.timezone.utc)
+        if entity_datetime.tzinfo is None:
+            in_range = naive_range_start <= entity_datetime < naive_range_end
+        else:
+            in_range = range_start <= entity_datetime < range_end
 
-        if not expected_datetime_range.contains(tz_datetime):
+        if not in_range:
             return (
                 False,
                 f"Entity datetime {entity.datetime} is not in the expected range {expected_datetime_range}",
             )
 
+    # Check the entity sizes.
+    actual_size = sum(len(entity.content or b"") for entity in entities)
+    claimed_size = sum(entity.content_size_bytes for entity in entities)
+
     if actual_size < claimed_size or actual_size < data_entity_bucket.size_bytes:
         return (
             False,
@@ -142,7 +157,8 @@ def are_entities_unique(entities: List[DataEntity]) -> bool:
     uris = set()
 
     for entity in entities:
-        entity_content_hash = hashlib.sha1(entity.content).hexdigest()
+        # Compare raw digests; hex encoding each one adds nothing for duplicate detection.
+        entity_content_hash = hashlib.sha1(entity.content).digest()
         normalized_uri = _normalize_uri(entity.uri)
         # Check that the hash and URI have not been seen before
         if entity_content_hash in entity_content_hash_set or normalized_uri in uris: